@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 from .converters import Converter, UnstructureStrategy
+from .dispatch_table import EvictionPolicy
 
 __all__ = ('global_converter', 'unstructure', 'structure',
            'structure_attrs_fromtuple', 'structure_attrs_fromdict',
-           'UnstructureStrategy')
+           'UnstructureStrategy', 'EvictionPolicy')
 
 __author__ = 'Tin Tvrtković'
 __email__ = 'tinchester@gmail.com'
@@ -1,3 +1,4 @@
+import math
 import sys
 
 version_info = sys.version_info[0:3]
@@ -5,11 +6,32 @@ is_py2 = version_info[0] == 2
 is_py3 = version_info[0] == 3
 
 if is_py2:
-    from functools32 import lru_cache
     from singledispatch import singledispatch
     unicode = unicode  # noqa
     bytes = str
+    int_types = (int, long)  # noqa
+    # The widest array typecode; 'q' is Python 3 only.
+    array_int_typecode = 'l'
+
+    def isfinite(x):
+        return not (math.isinf(x) or math.isnan(x))
 else:
-    from functools import lru_cache, singledispatch  # noqa
+    from functools import singledispatch  # noqa
     unicode = str
     bytes = bytes
+    int_types = (int,)
+    array_int_typecode = 'q'
+    isfinite = math.isfinite
+
+
+def get_origin(typ):
+    """Return the runtime class or construct a typing type is based on.
+
+    For example, ``list`` for both ``List`` and ``List[int]``, and ``Union``
+    for unions. Returns ``None`` for anything else.
+    """
+    # Older versions of typing keep the runtime class in `__extra__`.
+    extra = getattr(typ, '__extra__', None)
+    if extra is not None:
+        return extra
+    return getattr(typ, '__origin__', None)
@@ -0,0 +1,431 @@
+"""A compact binary format, driven by the static types of attrs classes.
+
+The format carries no field names or type tags; reading requires the type
+the data was written with. Instances of ``attrs`` classes are written as
+their ``__init__`` fields in order, like the ``AS_TUPLE`` strategy:
+
+* ``int`` - a zigzag-encoded varint,
+* ``float`` - an 8-byte little-endian double,
+* ``bool`` - a single byte,
+* ``bytes`` and ``str`` - a varint length, followed by the (UTF-8) bytes,
+* enums - the varint index of the member,
+* ``Optional[T]`` - a presence byte, followed by the value if present,
+* sequences, sets and mappings - a varint length, followed by the elements
+  (or keys and values),
+* heterogeneous tuples - the elements, in order.
+
+Untyped (and ``Any``) values are written with a leading tag byte, and may be
+``None``, booleans, numbers, strings, bytes, lists (or tuples) and dicts of
+these.
+"""
+from enum import Enum
+from struct import Struct
+from typing import AbstractSet, Any, Mapping, Sequence, Union
+
+from ._compat import bytes, get_origin, int_types, is_py2, unicode
+from .dispatch_table import DispatchTable
+from .gen import _compile_fn
+
+NoneType = type(None)
+_double = Struct('<d')
+
+
+def _encode_uvarint(n, out):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _decode_uvarint(buf, pos):
+    b = buf[pos]
+    pos += 1
+    if b < 0x80:
+        return b, pos
+    res = b & 0x7f
+    shift = 7
+    while True:
+        b = buf[pos]
+        pos += 1
+        res |= (b & 0x7f) << shift
+        if b < 0x80:
+            return res, pos
+        shift += 7
+
+
+def _encode_int(v, out):
+    # Zigzag encoding, so small negative numbers stay small.
+    _encode_uvarint(v << 1 if v >= 0 else (-v << 1) - 1, out)
+
+
+def _decode_int(buf, pos):
+    n, pos = _decode_uvarint(buf, pos)
+    return (n >> 1) ^ -(n & 1), pos
+
+
+def _encode_float(v, out):
+    out += _double.pack(v)
+
+
+def _decode_float(buf, pos):
+    return _double.unpack_from(buf, pos)[0], pos + 8
+
+
+def _encode_bool(v, out):
+    out.append(1 if v else 0)
+
+
+def _decode_bool(buf, pos):
+    return buf[pos] != 0, pos + 1
+
+
+def _encode_bytes(v, out):
+    _encode_uvarint(len(v), out)
+    out += v
+
+
+def _decode_bytes(buf, pos):
+    n, pos = _decode_uvarint(buf, pos)
+    end = pos + n
+    return bytes(buf[pos:end]), end
+
+
+def _encode_unicode(v, out):
+    _encode_bytes(v.encode('utf-8'), out)
+
+
+def _decode_unicode(buf, pos):
+    n, pos = _decode_uvarint(buf, pos)
+    end = pos + n
+    return buf[pos:end].decode('utf-8'), end
+
+
+_primitive_codecs = {
+    int: (_encode_int, _decode_int),
+    float: (_encode_float, _decode_float),
+    bool: (_encode_bool, _decode_bool),
+    bytes: (_encode_bytes, _decode_bytes),
+    unicode: (_encode_unicode, _decode_unicode),
+}
+if is_py2:
+    _primitive_codecs[long] = _primitive_codecs[int]  # noqa
+
+
+# Tags of untyped values.
+_TAG_NONE, _TAG_FALSE, _TAG_TRUE, _TAG_INT, _TAG_FLOAT, _TAG_UNICODE, \
+    _TAG_BYTES, _TAG_LIST, _TAG_DICT = range(9)
+
+
+def _encode_any(v, out):
+    cl = v.__class__
+    if v is None:
+        out.append(_TAG_NONE)
+    elif cl is bool:
+        out.append(_TAG_TRUE if v else _TAG_FALSE)
+    elif cl in int_types:
+        out.append(_TAG_INT)
+        _encode_int(v, out)
+    elif cl is float:
+        out.append(_TAG_FLOAT)
+        _encode_float(v, out)
+    elif cl is unicode:
+        out.append(_TAG_UNICODE)
+        _encode_unicode(v, out)
+    elif cl is bytes:
+        out.append(_TAG_BYTES)
+        _encode_bytes(v, out)
+    elif cl is list or cl is tuple:
+        out.append(_TAG_LIST)
+        _encode_uvarint(len(v), out)
+        for e in v:
+            _encode_any(e, out)
+    elif cl is dict:
+        out.append(_TAG_DICT)
+        _encode_uvarint(len(v), out)
+        for k, e in v.items():
+            _encode_any(k, out)
+            _encode_any(e, out)
+    else:
+        raise ValueError('Untyped values of type {0} have no binary '
+                         'representation.'.format(cl))
+
+
+def _decode_any(buf, pos):
+    tag = buf[pos]
+    pos += 1
+    if tag == _TAG_NONE:
+        return None, pos
+    if tag == _TAG_FALSE:
+        return False, pos
+    if tag == _TAG_TRUE:
+        return True, pos
+    if tag == _TAG_INT:
+        return _decode_int(buf, pos)
+    if tag == _TAG_FLOAT:
+        return _decode_float(buf, pos)
+    if tag == _TAG_UNICODE:
+        return _decode_unicode(buf, pos)
+    if tag == _TAG_BYTES:
+        return _decode_bytes(buf, pos)
+    n, pos = _decode_uvarint(buf, pos)
+    if tag == _TAG_LIST:
+        res = []
+        for _ in range(n):
+            e, pos = _decode_any(buf, pos)
+            res.append(e)
+        return res, pos
+    if tag == _TAG_DICT:
+        res = {}
+        for _ in range(n):
+            k, pos = _decode_any(buf, pos)
+            res[k], pos = _decode_any(buf, pos)
+        return res, pos
+    raise ValueError('Unknown tag {0}.'.format(tag))
+
+
+def make_binary_codec_fns(cl, codec):
+    # type: (Type, BinaryCodec) -> Tuple[Callable, Callable]
+    """Generate functions writing and reading instances of the attrs class
+    `cl`.
+
+    The ``__init__`` fields are written in order, using the codecs of their
+    types; instances are created by calling `cl` with the values
+    positionally. Primitives are mostly handled inline.
+    """
+    globs = {'__cl': cl, '__pack': _double.pack,
+             '__unpack_from': _double.unpack_from,
+             '__encode_uvarint': _encode_uvarint}
+    enc_lines = ['def encode_binary(obj, out):',
+                 '    append = out.append']
+    dec_lines = ['def decode_binary(buf, pos):']
+    args = []
+    for i, a in enumerate(cl.__attrs_attrs__):
+        if not a.init:
+            continue
+        val = 'v{0}'.format(i)
+        enc, dec = codec.field_codec(a.type)
+        enc_name = '__e{0}'.format(i)
+        dec_name = '__d{0}'.format(i)
+        globs[enc_name] = enc
+        globs[dec_name] = dec
+        enc_lines.append('    {0} = obj.{1}'.format(val, a.name))
+        if enc is _encode_int:
+            # Non-negative integers below 64 take a single byte.
+            enc_tmpl = [
+                '    if {0}.__class__ is int and 0 <= {0} < 64:',
+                '        append({0} << 1)',
+                '    else:',
+                '        {1}({0}, out)',
+            ]
+            dec_tmpl = [
+                '    b = buf[pos]',
+                '    if b < 0x80:',
+                '        {0} = (b >> 1) ^ -(b & 1)',
+                '        pos += 1',
+                '    else:',
+                '        {0}, pos = {2}(buf, pos)',
+            ]
+        elif enc is _encode_float:
+            enc_tmpl = ['    out += __pack({0})']
+            dec_tmpl = ['    {0}, = __unpack_from(buf, pos)',
+                        '    pos += 8']
+        elif enc is _encode_unicode or enc is _encode_bytes:
+            enc_tmpl = [
+                '    n = len({0})',
+                '    if n < 0x80:',
+                '        append(n)',
+                '    else:',
+                '        __encode_uvarint(n, out)',
+                '    out += {0}',
+            ]
+            if enc is _encode_unicode:
+                enc_tmpl.insert(0, "    {0} = {0}.encode('utf-8')")
+            dec_tmpl = ['    {0}, pos = {2}(buf, pos)']
+        elif enc is _encode_bool:
+            enc_tmpl = ['    append(1 if {0} else 0)']
+            dec_tmpl = ['    {0} = buf[pos] != 0',
+                        '    pos += 1']
+        else:
+            enc_tmpl = ['    {1}({0}, out)']
+            dec_tmpl = ['    {0}, pos = {2}(buf, pos)']
+        enc_lines.extend(line.format(val, enc_name, dec_name)
+                         for line in enc_tmpl)
+        dec_lines.extend(line.format(val, enc_name, dec_name)
+                         for line in dec_tmpl)
+        args.append(val)
+    dec_lines.append('    return __cl({0}), pos'.format(', '.join(args)))
+    return (_compile_fn(cl, 'encode_binary', enc_lines, globs),
+            _compile_fn(cl, 'decode_binary', dec_lines, globs))
+
+
+class BinaryCodec(object):
+    """
+    BinaryCodec writes and reads values in the compact binary format,
+    given their types.
+
+    A pair of encoding and decoding functions is resolved once per type
+    and cached; ``attrs`` classes get generated functions.
+    """
+    __slots__ = ('_table', '_pending', 'dispatch')
+
+    def __init__(self):
+        self._table = DispatchTable(self._make_codec)
+        self.dispatch = self._table.dispatch
+        # Classes whose functions are being generated, for recursive
+        # classes.
+        self._pending = {}
+
+    def clear(self):
+        self._table.clear()
+
+    def dumps(self, obj, cl):
+        # type: (Any, Type) -> bytes
+        out = bytearray()
+        self.dispatch(cl)[0](obj, out)
+        return bytes(out)
+
+    def loads(self, data, cl):
+        # type: (bytes, Type) -> Any
+        if is_py2:
+            # Indexing needs to produce integers.
+            data = bytearray(data)
+        obj, pos = self.dispatch(cl)[1](data, 0)
+        if pos != len(data):
+            raise ValueError('Extra data after a binary {0}.'.format(cl))
+        return obj
+
+    def field_codec(self, type_):
+        """Return the functions for a field of type `type_`.
+
+        Classes being generated get functions looking up the finished ones
+        on first use.
+        """
+        if type_ in self._pending:
+            def encode_pending(v, out):
+                return self.dispatch(type_)[0](v, out)
+
+            def decode_pending(buf, pos):
+                return self.dispatch(type_)[1](buf, pos)
+            return encode_pending, decode_pending
+        return self.dispatch(type_)
+
+    def _make_codec(self, type_):
+        if type_ is None or type_ is Any:
+            return _encode_any, _decode_any
+        if type_ in _primitive_codecs:
+            return _primitive_codecs[type_]
+        if getattr(type_, '__attrs_attrs__', None) is not None:
+            self._pending[type_] = True
+            try:
+                return make_binary_codec_fns(type_, self)
+            finally:
+                del self._pending[type_]
+        if isinstance(type_, type) and issubclass(type_, Enum):
+            return self._make_enum_codec(type_)
+        origin = get_origin(type_)
+        args = getattr(type_, '__args__', None)
+        if origin is Union:
+            non_none = [t for t in args if t is not NoneType]
+            if len(non_none) == 1 and len(args) == 2:
+                return self._make_optional_codec(non_none[0])
+        elif isinstance(origin, type) and args and Any not in args:
+            if issubclass(origin, tuple):
+                if args[-1] is Ellipsis:
+                    return self._make_collection_codec(tuple, args[0])
+                return self._make_tuple_codec(args)
+            if issubclass(origin, Mapping):
+                return self._make_mapping_codec(args[0], args[1])
+            if issubclass(origin, frozenset):
+                return self._make_collection_codec(frozenset, args[0])
+            if issubclass(origin, AbstractSet):
+                return self._make_collection_codec(set, args[0])
+            if issubclass(origin, Sequence):
+                return self._make_collection_codec(list, args[0])
+        raise ValueError('{0} has no binary representation; only attrs '
+                         'classes, primitives, enums, optionals and typed '
+                         'collections are supported.'.format(type_))
+
+    def _make_enum_codec(self, cl):
+        members = list(cl)
+        indices = {m: i for i, m in enumerate(members)}
+
+        def encode_enum(v, out):
+            _encode_uvarint(indices[v], out)
+
+        def decode_enum(buf, pos):
+            i, pos = _decode_uvarint(buf, pos)
+            return members[i], pos
+        return encode_enum, decode_enum
+
+    def _make_optional_codec(self, type_):
+        enc, dec = self.field_codec(type_)
+
+        def encode_optional(v, out):
+            if v is None:
+                out.append(0)
+            else:
+                out.append(1)
+                enc(v, out)
+
+        def decode_optional(buf, pos):
+            if buf[pos] == 0:
+                return None, pos + 1
+            return dec(buf, pos + 1)
+        return encode_optional, decode_optional
+
+    def _make_collection_codec(self, factory, type_):
+        enc, dec = self.field_codec(type_)
+
+        def encode_collection(v, out):
+            _encode_uvarint(len(v), out)
+            for e in v:
+                enc(e, out)
+
+        def decode_collection(buf, pos):
+            n, pos = _decode_uvarint(buf, pos)
+            res = []
+            append = res.append
+            for _ in range(n):
+                e, pos = dec(buf, pos)
+                append(e)
+            return (res if factory is list else factory(res)), pos
+        return encode_collection, decode_collection
+
+    def _make_tuple_codec(self, types):
+        codecs = [self.field_codec(t) for t in types]
+        encs = [enc for enc, _ in codecs]
+        decs = [dec for _, dec in codecs]
+
+        def encode_tuple(v, out):
+            if len(v) != len(encs):
+                raise ValueError('Expected a tuple of {0} elements, got {1}.'
+                                 .format(len(encs), len(v)))
+            for enc, e in zip(encs, v):
+                enc(e, out)
+
+        def decode_tuple(buf, pos):
+            res = []
+            for dec in decs:
+                e, pos = dec(buf, pos)
+                res.append(e)
+            return tuple(res), pos
+        return encode_tuple, decode_tuple
+
+    def _make_mapping_codec(self, key_type, val_type):
+        enc_key, dec_key = self.field_codec(key_type)
+        enc_val, dec_val = self.field_codec(val_type)
+
+        def encode_mapping(v, out):
+            _encode_uvarint(len(v), out)
+            for k, e in v.items():
+                enc_key(k, out)
+                enc_val(e, out)
+
+        def decode_mapping(buf, pos):
+            n, pos = _decode_uvarint(buf, pos)
+            res = {}
+            for _ in range(n):
+                k, pos = dec_key(buf, pos)
+                res[k], pos = dec_val(buf, pos)
+            return res, pos
+        return encode_mapping, decode_mapping
@@ -0,0 +1,137 @@
+"""Conversion between lists of attrs instances and columns."""
+from array import array
+from operator import attrgetter
+
+from attr import NOTHING
+
+from ._compat import array_int_typecode, int_types
+from .gen import _is_plain_class, make_kwargs_init_fn
+
+# NumPy, once imported by `_get_numpy`.
+_numpy = NOTHING
+
+
+def _get_numpy():
+    """Import NumPy on first use, returning ``None`` if it's not installed.
+
+    NumPy is slow to import, so it's only imported if columns use it.
+    """
+    global _numpy
+    if _numpy is NOTHING:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+def _primitive_column(values, type_, use_numpy):
+    """Pack the values of an int or float attribute into an array.
+
+    The values are returned as-is if any of them doesn't fit.
+    """
+    kinds = set(map(type, values))
+    if type_ is int:
+        if not kinds.issubset(int_types):
+            return values
+        typecode = array_int_typecode
+        dtype = 'int64'
+    else:
+        if not kinds.issubset(int_types + (float,)):
+            return values
+        typecode = 'd'
+        dtype = 'float64'
+    try:
+        numpy = _get_numpy() if use_numpy else None
+        if numpy is not None:
+            return numpy.array(values, dtype=dtype)
+        return array(typecode, values)
+    except OverflowError:
+        return values
+
+
+def unstructure_columns(converter, objs, cl, use_numpy=True):
+    """Unstructure instances of `cl` into columns, using the converter's
+    hooks. See ``Converter.unstructure_columns``.
+    """
+    if not isinstance(objs, (list, tuple)):
+        objs = list(objs)
+    dispatch = converter._unstructure_func.dispatch
+    res = converter._dict_factory()
+    for a in cl.__attrs_attrs__:
+        type_ = a.type
+        values = list(map(attrgetter(a.name), objs))
+        if not _is_plain_class(type_):
+            res[a.name] = [dispatch(v.__class__)(v) for v in values]
+            continue
+        handler = dispatch(type_)
+        if handler == converter._unstructure_identity:
+            if type_ is int or type_ is float:
+                res[a.name] = _primitive_column(values, type_, use_numpy)
+            else:
+                res[a.name] = [v if v.__class__ is type_
+                               else dispatch(v.__class__)(v)
+                               for v in values]
+        else:
+            res[a.name] = [handler(v) if v.__class__ is type_
+                           else dispatch(v.__class__)(v)
+                           for v in values]
+    return res
+
+
+def _structure_column(converter, column, type_):
+    """Structure a column of values into `type_`."""
+    if type_ is None:
+        return column
+    tolist = getattr(column, 'tolist', None)
+    if tolist is not None:
+        # NumPy arrays and array.array convert to lists of Python
+        # primitives in a single call.
+        column = tolist()
+    handler = converter._structure_func.dispatch(type_)
+    if handler == converter._structure_trusted:
+        # Values are assumed to be of the right type.
+        return column
+    if handler == converter._structure_call:
+        if set(map(type, column)).issubset((type_,)):
+            return column
+        return list(map(type_, column))
+    return [handler(v, type_) for v in column]
+
+
+def structure_columns(converter, columns, cl):
+    """Structure columns into instances of `cl`, using the converter's
+    hooks. See ``Converter.structure_columns``.
+    """
+    arg_names = []
+    structured = []
+    missing = False
+    positional = True
+    length = None
+    for a in cl.__attrs_attrs__:
+        if not a.init:
+            continue
+        try:
+            column = columns[a.name]
+        except KeyError:
+            if a.default is NOTHING:
+                raise
+            missing = True
+            continue
+        if missing:
+            # A column follows a missing one, so the arguments can't be
+            # passed positionally.
+            positional = False
+        if length is None:
+            length = len(column)
+        elif len(column) != length:
+            raise ValueError('Column {0} has {1} values, expected {2}.'
+                             .format(a.name, len(column), length))
+        # attrs strips leading underscores from __init__ argument names.
+        arg_names.append(a.name.lstrip('_'))
+        structured.append(_structure_column(converter, column, a.type))
+    if not structured:
+        return []
+    init = cl if positional else make_kwargs_init_fn(cl, arg_names)
+    return list(map(init, *structured))
@@ -1,16 +1,41 @@
+import copy
+import gc
+from collections import namedtuple
+from contextlib import contextmanager
 from enum import Enum
 from typing import (Mapping, Sequence, Optional,
                     TypeVar, Any, FrozenSet, MutableSet,
-                    Tuple, _Union)
-from ._compat import lru_cache, unicode, bytes, is_py2
-from .disambiguators import create_uniq_field_dis_func
+                    Tuple, Union, _Union, Iterable)
+from ._compat import unicode, bytes, is_py2, get_origin, int_types
+from .binary_codec import BinaryCodec
+from .columns import structure_columns, unstructure_columns
+from .disambiguators import create_decision_tree_dis_func
+from .dispatch_table import DispatchTable, EvictionPolicy
+from .function_dispatch import ATTRS_CLASS
+from .gen import (make_dict_structure_fn, make_dict_unstructure_fn,
+                  make_tuple_structure_fn, make_tuple_unstructure_fn)
+from .json_codec import JsonEncoder, iter_json_array
+from .lazy import UnstructureView, make_lazy_structure_fn
+from .memo import Interner, UnstructureMemo, is_internable, is_memoizable
 from .multistrategy_dispatch import MultiStrategyDispatch
+from .parallel import structure_parallel
+from .spec import ConverterSpec
 
 
 NoneType = type(None)
+# Members of unions structured by the runtime type of the value.
+_PRIMITIVE_TYPES = frozenset((bool, float, unicode, bytes) + int_types)
+# Collections which can be iterated more than once.
+_REITERABLE = frozenset((list, tuple, set, frozenset, dict))
+# Classes of unstructured values, resolved by frozen converters.
+_BUILTIN_CLASSES = (NoneType, bool, float, unicode, bytes, list, tuple, set,
+                    frozenset, dict) + int_types
 T = TypeVar('T')
 V = TypeVar('V')
 
+DispatchCacheInfo = namedtuple('DispatchCacheInfo',
+                               ['structure', 'unstructure'])
+
 
 class UnstructureStrategy(Enum):
     """`attrs` classes unstructuring strategies."""
@@ -27,20 +52,111 @@ def _is_union_type(obj):
     return isinstance(obj, _Union)
 
 
+def _is_optional_type(obj):
+    """Is the object a union of ``NoneType`` and a single other type?"""
+    return (isinstance(obj, _Union) and len(obj.__args__) == 2 and
+            NoneType in obj.__args__)
+
+
 def _subclass(typ):
     """ a shortcut """
     return (lambda cls: issubclass(cls, typ))
 
 
+def _elem_type(cl):
+    """Return the element type of a generic collection, or ``None`` if
+    it's ``Any`` or missing."""
+    args = getattr(cl, '__args__', None)
+    if not args or args[0] is Any:
+        return None
+    return args[0]
+
+
+def _structure_list_any(obj, _):
+    return list(obj)
+
+
+def _structure_set_any(obj, _):
+    return set(obj)
+
+
+def _structure_frozenset_any(obj, _):
+    return frozenset(obj)
+
+
+def _structure_dict_any(obj, _):
+    return dict(obj)
+
+
+def _structure_tuple_any(obj, _):
+    return tuple(obj)
+
+
+def _iter_structure_hetero(handlers_and_types, objs):
+    """Lazily structure the elements of a heterogeneous tuple."""
+    it = iter(objs)
+    for handler, type_ in handlers_and_types:
+        try:
+            obj = next(it)
+        except StopIteration:
+            return
+        yield handler(obj, type_)
+
+
+@contextmanager
+def _paused_gc(pause=True):
+    """Disable the cyclic garbage collector for the duration of the block."""
+    if not pause or not gc.isenabled():
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
 class Converter(object):
     """Converts between structured and unstructured data."""
     __slots__ = ('_dis_func_cache', '_unstructure_func', '_unstructure_attrs',
                  '_structure_attrs', '_dict_factory',
-                 '_union_registry', '_structure_func')
+                 '_union_registry', '_structure_func', '_asdict_fns',
+                 '_astuple_fns', '_fromdict_fns', '_fromtuple_fns',
+                 '_init_kwargs', '_registrations', '_json_encoder',
+                 '_binary_codec', '_lazy_fns', '_union_fns',
+                 '_unstructure_memo', '_interner', '_copy_collections',
+                 '_trusted', '_frozen')
 
     def __init__(self, dict_factory=dict,
-                 unstruct_strat=UnstructureStrategy.AS_DICT):
+                 unstruct_strat=UnstructureStrategy.AS_DICT,
+                 dispatch_cache_size=None,
+                 dispatch_cache_policy=EvictionPolicy.LRU,
+                 dispatch_cache_stats=False,
+                 unstructure_memo_size=None,
+                 intern_size=None,
+                 copy_collections=True,
+                 trusted=False):
         unstruct_strat = UnstructureStrategy(unstruct_strat)
+        # Recorded so an equivalent converter can be rebuilt from a spec.
+        self._init_kwargs = {
+            'dict_factory': dict_factory,
+            'unstruct_strat': unstruct_strat,
+            'dispatch_cache_size': dispatch_cache_size,
+            'dispatch_cache_policy': dispatch_cache_policy,
+            'dispatch_cache_stats': dispatch_cache_stats,
+            'unstructure_memo_size': unstructure_memo_size,
+            'intern_size': intern_size,
+            'copy_collections': copy_collections,
+            'trusted': trusted,
+        }
+        self._registrations = []
+        self._trusted = trusted
+        self._frozen = False
+        cache_opts = {
+            'maxsize': dispatch_cache_size,
+            'policy': dispatch_cache_policy,
+            'stats': dispatch_cache_stats,
+        }
 
         # Create a per-instance cache.
         if unstruct_strat is UnstructureStrategy.AS_DICT:
@@ -50,10 +166,10 @@ class Converter(object):
             self._unstructure_attrs = self.unstructure_attrs_astuple
             self._structure_attrs = self.structure_attrs_fromtuple
 
-        self._dis_func_cache = lru_cache()(self._get_dis_func)
+        self._dis_func_cache = DispatchTable(self._get_dis_func).dispatch
 
         self._unstructure_func = MultiStrategyDispatch(
-            self._unstructure_identity
+            self._unstructure_identity, **cache_opts
         )
         self._unstructure_func.register_cls_list([
             (bytes, self._unstructure_identity),
@@ -63,40 +179,154 @@ class Converter(object):
             (_subclass(Mapping), self._unstructure_mapping),
             (_subclass(Sequence), self._unstructure_seq),
             (_subclass(Enum), self._unstructure_enum),
-            (_is_attrs_class, self._unstructure_attrs),
+            (_is_attrs_class, self._unstructure_attrs, ATTRS_CLASS),
         ])
 
         # Per-instance register of to-attrs converters.
         # Singledispatch dispatches based on the first argument, so we
         # store the function and switch the arguments in self.loads.
-        self._structure_func = MultiStrategyDispatch(self._structure_default)
+        self._structure_func = MultiStrategyDispatch(self._structure_default,
+                                                     **cache_opts)
+        # Hooks for generic types are created per type, with the hooks of
+        # their arguments resolved once.
+        self._structure_func.register_func_factory_list([
+            (_subclass(Sequence), self._gen_structure_list),
+            (_subclass(MutableSet), self._gen_structure_set),
+            (_subclass(FrozenSet), self._gen_structure_frozenset),
+            (_subclass(Mapping), self._gen_structure_dict),
+            (_subclass(Tuple), self._gen_structure_tuple),
+        ])
         self._structure_func.register_func_list([
-            (_subclass(Sequence), self._structure_list),
-            (_subclass(MutableSet), self._structure_set),
-            (_subclass(FrozenSet), self._structure_frozenset),
-            (_subclass(Mapping), self._structure_dict),
-            (_subclass(Tuple), self._structure_tuple),
-            (_is_union_type, self._structure_union),
-            (_is_attrs_class, self._structure_attrs),
+            (_is_union_type, self._structure_union, Union),
+        ])
+        self._structure_func.register_func_factory_list([
+            (_is_optional_type, self._gen_structure_optional, Union),
+        ])
+        self._structure_func.register_func_list([
+            (_is_attrs_class, self._structure_attrs, ATTRS_CLASS),
         ])
         # Strings are sequences.
+        structure_primitive = (self._structure_trusted if trusted
+                               else self._structure_call)
         self._structure_func.register_cls_list([
             (unicode, self._structure_unicode if is_py2
-             else self._structure_call),
-            (bytes, self._structure_call),
-            (int, self._structure_call),
-            (float, self._structure_call),
-            (Enum, self._structure_call),
+             else structure_primitive),
+            (bytes, structure_primitive),
+            (int, structure_primitive),
+            (float, structure_primitive),
+            (Enum, structure_primitive),
         ])
+        if intern_size is not None and intern_size > 0:
+            # Equal strings, bytes and frozen instances are shared.
+            self._interner = Interner(intern_size)
+            self._structure_func.register_cls_list([
+                (unicode, self._structure_interned),
+                (bytes, self._structure_interned),
+            ])
+        else:
+            self._interner = None
 
         self._dict_factory = dict_factory
+        self._copy_collections = copy_collections
 
         # Unions are instances now, not classes. We use different registry.
         self._union_registry = {}
 
+        # Generated per-class functions, invalidated when hooks change.
+        self._asdict_fns = {}
+        self._astuple_fns = {}
+        self._fromdict_fns = {}
+        self._fromtuple_fns = {}
+        self._lazy_fns = {}
+        self._union_fns = {}
+        self._json_encoder = JsonEncoder(self)
+        self._binary_codec = BinaryCodec()
+        # Unstructured frozen instances, if enabled.
+        self._unstructure_memo = UnstructureMemo(unstructure_memo_size)
+
     def unstructure(self, obj):
         return self._unstructure_func.dispatch(obj.__class__)(obj)
 
+    def unstructure_view(self, obj):
+        # type: (Any) -> UnstructureView
+        """Return a read-only mapping over the attrs instance `obj`,
+        unstructuring each attribute only when its key is accessed.
+
+        Values are unstructured through the hooks, like with
+        ``unstructure``, and cached. ``materialize()`` returns every item
+        in a mapping created with the dict factory.
+        """
+        return UnstructureView(obj, self)
+
+    def unstructure_many(self, objs, cl=None, pause_gc=False):
+        # type: (Iterable[Any], Optional[Type]) -> List[Any]
+        """Unstructure every object of an iterable into a list.
+
+        If `cl` is given, all objects are assumed to be instances of it, and
+        its hook is looked up only once. If `pause_gc` is true, the cyclic
+        garbage collector is disabled while the batch is processed.
+        """
+        with _paused_gc(pause_gc):
+            if cl is not None:
+                handler = self._unstructure_func.dispatch(cl)
+                return [handler(obj) for obj in objs]
+            dispatch = self._unstructure_func.dispatch
+            return [dispatch(obj.__class__)(obj) for obj in objs]
+
+    def unstructure_columns(self, objs, cl, use_numpy=True):
+        # type: (Iterable[Any], Type) -> Mapping[str, Sequence]
+        """Unstructure instances of the attrs class `cl` into columns.
+
+        The result maps attribute names to sequences of values, in order,
+        and is created using the dict factory. Columns of attributes typed
+        as ``int`` or ``float`` are arrays: NumPy arrays if NumPy is
+        installed and `use_numpy` is true, ``array.array`` otherwise. If
+        any value doesn't fit the array, the column is a list instead. Other
+        columns are lists of unstructured values.
+        """
+        return unstructure_columns(self, objs, cl, use_numpy=use_numpy)
+
+    def dumps(self, obj):
+        # type: (Any) -> str
+        """Serialize an object to JSON text, using the unstructure hooks.
+
+        The result is the same as
+        ``json.dumps(converter.unstructure(obj), separators=(',', ':'))``,
+        except ``attrs`` instances are written directly, without
+        unstructuring them into dictionaries or tuples first. Their fields
+        are written in definition order.
+        """
+        return self._json_encoder.encode(obj)
+
+    def dumps_bytes(self, obj):
+        # type: (Any) -> bytes
+        """Serialize an object to JSON, encoded as bytes.
+
+        See ``dumps``.
+        """
+        return self._json_encoder.encode(obj).encode('ascii')
+
+    def dumps_binary(self, obj, cl=None):
+        # type: (Any, Optional[Type]) -> bytes
+        """Serialize an object to the compact binary format.
+
+        The format is driven by the static types of ``attrs`` classes, and
+        contains no field names or type tags; see ``cattr.binary_codec``.
+        `cl` is the type to write `obj` as, by default its class. Hooks
+        are not used.
+        """
+        return self._binary_codec.dumps(obj,
+                                        obj.__class__ if cl is None else cl)
+
+    def loads_binary(self, data, cl):
+        # type: (bytes, Type[T]) -> T
+        """Read an object of type `cl` from the compact binary format.
+
+        Instances are created directly from the data, without intermediate
+        tuples.
+        """
+        return self._binary_codec.loads(data, cl)
+
     @property
     def unstruct_strat(self):
         # type: () -> UnstructureStrategy
@@ -105,6 +335,107 @@ class Converter(object):
                 if self._unstructure_attrs == self.unstructure_attrs_asdict
                 else UnstructureStrategy.AS_TUPLE)
 
+    def dispatch_cache_info(self):
+        # type: () -> DispatchCacheInfo
+        """Report the statistics of the structure and unstructure dispatch
+        caches.
+        """
+        return DispatchCacheInfo(self._structure_func.cache_info(),
+                                 self._unstructure_func.cache_info())
+
+    def spec(self):
+        # type: () -> ConverterSpec
+        """Describe this converter and its registered hooks.
+
+        The result can be used to build an equivalent converter, and can be
+        pickled if the hooks are picklable.
+        """
+        return ConverterSpec.from_log(self, self._init_kwargs,
+                                      self._registrations)
+
+    @property
+    def frozen(self):
+        # type: () -> bool
+        """Whether hooks can no longer be registered; see ``freeze``."""
+        return self._frozen
+
+    def freeze(self, root_types=()):
+        # type: (Iterable[Type]) -> Converter
+        """Create a frozen copy of this converter, with the hooks for
+        `root_types`, and the types reachable from them, resolved ahead of
+        time.
+
+        Types are reached through the fields of ``attrs`` classes and the
+        arguments of generic types and unions; the functions specialized for
+        ``attrs`` classes are generated too. The copy's dispatch tables are
+        unbounded dicts which are never cleared, so a lookup is a plain dict
+        read. Types that weren't reached are resolved on first use.
+
+        Registering hooks on the copy raises ``TypeError``. The copy is built
+        from the converter's ``spec()``, so it doesn't see hooks registered
+        on this converter later.
+
+        Registered hooks and hook factories are reused as they are, so those
+        referring to this converter, like
+        ``lambda v, _: converter.structure(v, Inner)``, still dispatch
+        through it, not through the copy: their lookups aren't frozen, and
+        see hooks registered on this converter later. The hooks the copy
+        creates itself, like those for ``attrs`` classes and collections,
+        dispatch through the copy.
+        """
+        init_kwargs = dict(self._init_kwargs, dispatch_cache_size=None,
+                           dispatch_cache_stats=False)
+        frozen = ConverterSpec.from_log(self, init_kwargs,
+                                        self._registrations).build()
+        frozen._resolve_types(root_types)
+        frozen._frozen = True
+        return frozen
+
+    def _check_mutable(self):
+        if self._frozen:
+            raise TypeError('Hooks can\'t be registered on frozen '
+                            'converters.')
+
+    def _resolve_types(self, root_types):
+        """Resolve the hooks for the given types and the types reachable
+        from them, and generate the functions for ``attrs`` classes."""
+        seen = set()
+        todo = list(_BUILTIN_CLASSES) + list(root_types)
+        while todo:
+            t = todo.pop()
+            # Skip ``Any``, forward references and the like.
+            if t in seen or not (isinstance(t, type) or _is_union_type(t)):
+                continue
+            seen.add(t)
+            handler = self._structure_func.dispatch(t)
+            todo.extend(getattr(t, '__args__', None) or ())
+            if _is_union_type(t):
+                if (handler == self._structure_union and
+                        t not in self._union_registry):
+                    try:
+                        self._union_fns[t] = self._make_union_fn(t)
+                    except ValueError:
+                        # Raised again when structuring.
+                        pass
+                continue
+            if get_origin(t) is not None:
+                # Unstructuring dispatches on the classes of values, never
+                # on generics.
+                continue
+            unstructure_handler = self._unstructure_func.dispatch(t)
+            if not _is_attrs_class(t):
+                continue
+            todo.extend(a.type for a in t.__attrs_attrs__
+                        if a.type is not None)
+            if unstructure_handler == self.unstructure_attrs_asdict:
+                self._asdict_fns[t] = self._make_asdict_fn(t)
+            elif unstructure_handler == self.unstructure_attrs_astuple:
+                self._astuple_fns[t] = self._make_astuple_fn(t)
+            if handler == self.structure_attrs_fromdict:
+                self._fromdict_fns[t] = self._make_fromdict_fn(t)
+            elif handler == self.structure_attrs_fromtuple:
+                self._fromtuple_fns[t] = self._make_fromtuple_fn(t)
+
     def register_unstructure_hook(self, cls, func):
         # type: (Type[T], Callable[[T], Any]) -> None
         """Register a class-to-primitive converter function for a class.
@@ -112,14 +443,52 @@ class Converter(object):
         The converter function should take an instance of the class and return
         its Python equivalent.
         """
+        self._check_mutable()
         self._unstructure_func.register_cls_list([(cls, func)])
+        self._registrations.append(('register_unstructure_hook', (cls, func)))
+        self._asdict_fns.clear()
+        self._astuple_fns.clear()
+        self._json_encoder.clear()
+        self._unstructure_memo.clear()
 
-    def register_unstructure_hook_func(self, check_func, func):
+    def register_unstructure_hook_func(self, check_func, func, key=None):
         """Register a class-to-primitive converter function for a class, using
         a function to check if it's a match.
+
+        If the function can only match types with a particular index key
+        (a class, a typing origin like ``list`` or ``Union``, or
+        ``cattr.function_dispatch.ATTRS_CLASS``), passing it as `key`
+        avoids evaluating the function for other types.
         """
         # type: (Callable[Any], Callable[T], Any]) -> None
-        self._unstructure_func.register_func_list([(check_func, func)])
+        self._check_mutable()
+        self._unstructure_func.register_func_list([(check_func, func, key)])
+        self._registrations.append(('register_unstructure_hook_func',
+                                    (check_func, func, key)))
+        self._asdict_fns.clear()
+        self._astuple_fns.clear()
+        self._json_encoder.clear()
+        self._unstructure_memo.clear()
+
+    def register_unstructure_hook_factory(self, check_func, factory,
+                                          key=None):
+        # type: (Callable[[Type], bool], Callable[[Type], Callable]) -> None
+        """Register a factory creating unstructure hooks for the types
+        `check_func` matches.
+
+        The factory is called once per type, with the type, and returns its
+        hook; hooks are cached until hooks are registered again. `key` is
+        like in ``register_unstructure_hook_func``.
+        """
+        self._check_mutable()
+        self._unstructure_func.register_func_factory_list(
+            [(check_func, factory, key)])
+        self._registrations.append(('register_unstructure_hook_factory',
+                                    (check_func, factory, key)))
+        self._asdict_fns.clear()
+        self._astuple_fns.clear()
+        self._json_encoder.clear()
+        self._unstructure_memo.clear()
 
     def register_structure_hook(self, cl, func):
         """Register a primitive-to-class converter function for a type.
@@ -132,39 +501,275 @@ class Converter(object):
         is sometimes needed (for example, when dealing with generic classes).
         """
         # type: (Type[T], Callable[[Any, Type], T) -> None
+        self._check_mutable()
         if _is_union_type(cl):
             self._union_registry[cl] = func
+            # Handlers for optionals are resolved ahead of time.
+            self._structure_func.clear_cache()
         else:
             self._structure_func.register_cls_list([(cl, func)])
+        self._registrations.append(('register_structure_hook', (cl, func)))
+        self._fromdict_fns.clear()
+        self._fromtuple_fns.clear()
+        self._lazy_fns.clear()
+        self._union_fns.clear()
 
-    def register_structure_hook_func(self, check_func, func):
+    def register_structure_hook_func(self, check_func, func, key=None):
         # type: (Callable[Any], Callable[T], Any]) -> None
         """Register a class-to-primitive converter function for a class, using
         a function to check if it's a match.
+
+        If the function can only match types with a particular index key
+        (a class, a typing origin like ``list`` or ``Union``, or
+        ``cattr.function_dispatch.ATTRS_CLASS``), passing it as `key`
+        avoids evaluating the function for other types.
+        """
+        self._check_mutable()
+        self._structure_func.register_func_list([(check_func, func, key)])
+        self._registrations.append(('register_structure_hook_func',
+                                    (check_func, func, key)))
+        self._fromdict_fns.clear()
+        self._fromtuple_fns.clear()
+        self._lazy_fns.clear()
+        self._union_fns.clear()
+
+    def register_structure_hook_factory(self, check_func, factory, key=None):
+        # type: (Callable[[Type], bool], Callable[[Type], Callable]) -> None
+        """Register a factory creating structure hooks for the types
+        `check_func` matches.
+
+        The factory is called once per type, with the type, and returns its
+        hook. Factories can resolve the hooks of type arguments ahead of
+        time, like the hooks for generic collections do; hooks are cached
+        until hooks are registered again. `key` is like in
+        ``register_structure_hook_func``.
         """
-        self._structure_func.register_func_list([(check_func, func)])
+        self._check_mutable()
+        self._structure_func.register_func_factory_list(
+            [(check_func, factory, key)])
+        self._registrations.append(('register_structure_hook_factory',
+                                    (check_func, factory, key)))
+        self._fromdict_fns.clear()
+        self._fromtuple_fns.clear()
+        self._lazy_fns.clear()
+        self._union_fns.clear()
+
+    def register_tagged_union(self, union, tag_map, tag_field='type'):
+        # type: (Type, Mapping[Any, Type], str) -> None
+        """Register a union of attrs classes told apart by a tag field.
+
+        `tag_map` maps the values of the `tag_field` key to the classes of
+        the union. Structuring the union looks up the class by the tag, and
+        structures the mapping into it; no disambiguation function is
+        needed. Unstructured instances of the classes get their tag added,
+        unless the tag is an attribute of the class. Instances are always
+        unstructured into dictionaries, even with the ``AS_TUPLE`` strategy.
+        """
+        self._check_mutable()
+        # Registrations are logged as pairs, keeping specs hashable.
+        tag_items = tuple(tag_map.items() if isinstance(tag_map, Mapping)
+                          else tag_map)
+        members = set(union.__args__)
+        cl_tags = {}
+        for tag, cl in tag_items:
+            if cl not in members:
+                raise ValueError('{0} is not a member of {1}.'
+                                 .format(cl, union))
+            cl_tags.setdefault(cl, []).append(tag)
+        fromtuple = self.structure_attrs_fromtuple
+        fromdict = self.structure_attrs_fromdict
+        as_tuple = self._structure_attrs == fromtuple
+        unstructure_hooks = []
+        for cl, tags in cl_tags.items():
+            if any(a.name == tag_field for a in cl.__attrs_attrs__):
+                # The tag is unstructured with the other attributes.
+                if as_tuple:
+                    unstructure_hooks.append(
+                        (cl, self.unstructure_attrs_asdict))
+                continue
+            if len(tags) > 1:
+                raise ValueError('{0} has several tags, so the tag must be '
+                                 'one of its attributes.'.format(cl))
+            unstructure_hooks.append(
+                (cl, self._make_tagging_hook(tag_field, tags[0])))
+
+        tag_to_cl = dict(tag_items)
+        dispatch = self._structure_func.dispatch
+
+        def structure_tagged(obj, _):
+            try:
+                cl = tag_to_cl[obj[tag_field]]
+            except KeyError:
+                raise ValueError('Unknown or missing {0!r} tag for {1}.'
+                                 .format(tag_field, union))
+            handler = dispatch(cl)
+            if as_tuple and handler == fromtuple:
+                handler = fromdict
+            return handler(obj, cl)
+
+        self._union_registry[union] = structure_tagged
+        self._structure_func.clear_cache()
+        self._fromdict_fns.clear()
+        self._fromtuple_fns.clear()
+        self._lazy_fns.clear()
+        self._union_fns.clear()
+        self._unstructure_func.register_cls_list(unstructure_hooks)
+        self._registrations.append(('register_tagged_union',
+                                    (union, tag_items, tag_field)))
+        self._asdict_fns.clear()
+        self._astuple_fns.clear()
+        self._json_encoder.clear()
+        self._unstructure_memo.clear()
+
+    def _make_tagging_hook(self, tag_field, tag):
+        """Create a hook unstructuring an instance into a dictionary, and
+        adding its tag."""
+        unstructure = self.unstructure_attrs_asdict
+
+        def unstructure_tagged(obj):
+            res = unstructure(obj)
+            res[tag_field] = tag
+            return res
+        return unstructure_tagged
 
     def structure(self, obj, cl):
         """Convert unstructured Python data structures to structured data."""
         # type: (Any, Type) -> Any
         return self._structure_func.dispatch(cl)(obj, cl)
 
+    def structure_lazy(self, obj, cl):
+        # type: (Any, Type[T]) -> T
+        """Structure `obj` into an instance of the attrs class `cl`, deferring
+        the work for nested fields until they're first accessed.
+
+        Attributes typed as ``attrs`` classes, collections, unions or types
+        with custom hooks are kept unstructured until first accessed, then
+        structured and cached; nested ``attrs`` instances are themselves
+        lazy. Other attributes are structured right away.
+
+        The result is an instance of a subclass of `cl`, which reports `cl`
+        as its ``__class__`` and compares, hashes and pickles like an
+        instance of `cl`. Validators are not run.
+        """
+        try:
+            fn = self._lazy_fns[cl]
+        except KeyError:
+            as_tuple = self._structure_attrs == self.structure_attrs_fromtuple
+            fn = self._lazy_fns[cl] = make_lazy_structure_fn(
+                cl, self, as_tuple=as_tuple)
+        return fn(obj, cl)
+
+    def structure_many(self, objs, cl, pause_gc=False, executor=None,
+                       chunksize=1000):
+        # type: (Iterable[Any], Type[T]) -> List[T]
+        """Structure every object of an iterable into `cl`, returning a list.
+
+        The hook for `cl` is looked up only once. If `pause_gc` is true, the
+        cyclic garbage collector is disabled while the batch is processed.
+
+        If `executor` is given (an executor instance, or a class like
+        ``concurrent.futures.ProcessPoolExecutor``), the objects are
+        structured in chunks of `chunksize` by the executor's workers. Each
+        worker rebuilds this converter from its ``spec()``, so the registered
+        hooks, `cl` and the objects must be picklable.
+        """
+        if executor is not None:
+            return structure_parallel(self.spec(), objs, cl, executor,
+                                      chunksize, pause_gc=pause_gc)
+        handler = self._structure_func.dispatch(cl)
+        with _paused_gc(pause_gc):
+            return [handler(obj, cl) for obj in objs]
+
+    def structure_columns(self, columns, cl):
+        # type: (Mapping[str, Sequence], Type[T]) -> List[T]
+        """Structure a mapping of attribute names to columns of values into
+        a list of instances of the attrs class `cl`.
+
+        Each column is structured as a whole, using the hook for the
+        attribute type. Columns may be lists, ``array.array`` s or NumPy
+        arrays, and must all have the same length. Columns of attributes
+        with defaults may be omitted.
+        """
+        return structure_columns(self, columns, cl)
+
+    def iter_structure(self, objs, cl):
+        # type: (Iterable[Any], Type[Iterable[T]]) -> Iterator[T]
+        """Lazily structure an iterable into the elements of `cl`.
+
+        This is the streaming counterpart of ``structure(objs, cl)``: instead
+        of building the collection, an iterator yielding the structured
+        elements one at a time is returned. `objs` is consumed as the
+        iterator advances. `cl` may be any iterable generic except mappings,
+        for example ``List[A]``, ``FrozenSet[int]`` or ``Tuple[A, B]``.
+        """
+        origin = get_origin(cl)
+        if (not isinstance(origin, type) or not issubclass(origin, Iterable)
+                or issubclass(origin, Mapping)):
+            raise ValueError('Only iterable, non-mapping generics can be '
+                             'structured lazily, not {0}.'.format(cl))
+        args = cl.__args__
+        if not args or args[0] is Any:
+            return iter(objs)
+        if issubclass(origin, tuple) and args[-1] is not Ellipsis:
+            # A heterogeneous tuple.
+            dispatch = self._structure_func.dispatch
+            return _iter_structure_hetero([(dispatch(t), t) for t in args],
+                                          objs)
+        elem_type = args[0]
+        handler = self._structure_func.dispatch(elem_type)
+        return (handler(obj, elem_type) for obj in objs)
+
+    def iter_load(self, source, cl, chunk_size=65536):
+        # type: (Any, Type[Iterable[T]], int) -> Iterator[T]
+        """Incrementally decode a JSON array, structuring each element
+        into the element type of `cl` as soon as it's complete.
+
+        `source` is a file object, read `chunk_size` at a time, or an
+        iterable of chunks; chunks may be UTF-8 encoded bytes or text. `cl`
+        is any type accepted by ``iter_structure``, like ``List[A]``. Only
+        one element is decoded at a time, so memory use is proportional to
+        the size of an element rather than the whole document.
+        """
+        return self.iter_structure(iter_json_array(source, chunk_size), cl)
+
     # Classes to Python primitives.
     def unstructure_attrs_asdict(self, obj):
-        """Our version of `attrs.asdict`, so we can call back to us."""
-        attrs = obj.__class__.__attrs_attrs__
-        dispatch = self._unstructure_func.dispatch
-        rv = self._dict_factory()
-        for a in attrs:
-            name = a.name
-            v = getattr(obj, name)
-            rv[name] = dispatch(v.__class__)(v)
-        return rv
+        """Our version of `attrs.asdict`, so we can call back to us.
+
+        A specialized function is generated for each class on first use.
+        """
+        cl = obj.__class__
+        try:
+            fn = self._asdict_fns[cl]
+        except KeyError:
+            fn = self._asdict_fns[cl] = self._make_asdict_fn(cl)
+        return fn(obj)
+
+    def _make_asdict_fn(self, cl):
+        fn = make_dict_unstructure_fn(cl, self)
+        if self._unstructure_memo.enabled and is_memoizable(cl, self):
+            # Results are shallow copies, so callers can modify them.
+            fn = self._unstructure_memo.wrap(
+                fn, dict.copy if self._dict_factory is dict else copy.copy)
+        return fn
 
     def unstructure_attrs_astuple(self, obj):
-        """Our version of `attrs.astuple`, so we can call back to us."""
-        attrs = obj.__class__.__attrs_attrs__
-        return tuple(self.unstructure(getattr(obj, a.name)) for a in attrs)
+        """Our version of `attrs.astuple`, so we can call back to us.
+
+        A specialized function is generated for each class on first use.
+        """
+        cl = obj.__class__
+        try:
+            fn = self._astuple_fns[cl]
+        except KeyError:
+            fn = self._astuple_fns[cl] = self._make_astuple_fn(cl)
+        return fn(obj)
+
+    def _make_astuple_fn(self, cl):
+        fn = make_tuple_unstructure_fn(cl, self)
+        if self._unstructure_memo.enabled and is_memoizable(cl, self):
+            fn = self._unstructure_memo.wrap(fn)
+        return fn
 
     def _unstructure_enum(self, obj):
         """Convert an enum to its value."""
@@ -218,6 +823,16 @@ class Converter(object):
         """
         return cl(obj)
 
+    def _structure_trusted(self, obj, cl):
+        """Return ``obj`` if it's exactly of class ``cl``, or call ``cl``
+        with it.
+
+        Used instead of ``_structure_call`` by trusted converters.
+        """
+        if obj.__class__ is cl:
+            return obj
+        return cl(obj)
+
     def _structure_unicode(self, obj, cl):
         """Just call ``cl`` with the given ``obj``"""
         if not isinstance(obj, (bytes, unicode)):
@@ -225,96 +840,188 @@ class Converter(object):
         else:
             return obj
 
+    def _structure_interned(self, obj, cl):
+        """Structure a string or bytes, and intern it."""
+        if is_py2 and issubclass(cl, unicode):
+            obj = self._structure_unicode(obj, cl)
+            if obj.__class__ is not cl:
+                # Bytes are passed through.
+                return obj
+        else:
+            obj = cl(obj)
+        return self._interner.dispatch(cl)(obj)
+
     # Attrs classes.
 
     def structure_attrs_fromtuple(self, obj, cl):
         # type: (Sequence[Any], Type) -> Any
-        """Load an attrs class from a sequence (tuple)."""
-        conv_obj = []  # A list of converter parameters.
-        for a, value in zip(cl.__attrs_attrs__, obj):
-            # We detect the type by the metadata.
-            converted = self._structure_attr_from_tuple(a, a.name, value)
-            conv_obj.append(converted)
-
-        return cl(*conv_obj)
-
-    def _structure_attr_from_tuple(self, a, name, value):
-        """Handle an individual attrs attribute."""
-        type_ = a.type
-        if type_ is None:
-            # No type metadata.
-            return value
-        return self._structure_func.dispatch(type_)(value, type_)
+        """Load an attrs class from a sequence (tuple).
+
+        A specialized function is generated for each class on first use.
+        """
+        try:
+            fn = self._fromtuple_fns[cl]
+        except KeyError:
+            fn = self._fromtuple_fns[cl] = self._make_fromtuple_fn(cl)
+        return fn(obj, cl)
+
+    def _make_fromtuple_fn(self, cl):
+        fn = make_tuple_structure_fn(cl, self)
+        if self._interner is not None and is_internable(cl):
+            fn = self._interner.wrap(fn, cl)
+        return fn
 
     def structure_attrs_fromdict(self, obj, cl):
         # type: (Mapping, Type) -> Any
-        """Instantiate an attrs class from a mapping (dict)."""
-        # For public use.
-        conv_obj = obj.copy()  # Dict of converted parameters.
-        dispatch = self._structure_func.dispatch
-        for a in cl.__attrs_attrs__:
-            # We detect the type by metadata.
-            type_ = a.type
-            if type_ is None:
-                # No type.
-                continue
-            name = a.name
-            try:
-                val = obj[name]
-            except KeyError:
-                continue
-            conv_obj[name] = dispatch(type_)(val, type_)
+        """Instantiate an attrs class from a mapping (dict).
 
-        return cl(**conv_obj)
+        A specialized function is generated for each class on first use.
+        """
+        try:
+            fn = self._fromdict_fns[cl]
+        except KeyError:
+            fn = self._fromdict_fns[cl] = self._make_fromdict_fn(cl)
+        return fn(obj, cl)
 
-    def _structure_list(self, obj, cl):
-        # type: (Type[GenericMeta], Iterable[T]) -> List[T]
-        """Convert an iterable to a potentially generic list."""
-        if not cl.__args__ or cl.__args__[0] is Any:
-            return [e for e in obj]
-        else:
-            elem_type = cl.__args__[0]
-            return [self._structure_func.dispatch(elem_type)(e, elem_type)
-                    for e in obj]
-
-    def _structure_set(self, obj, cl):
-        # type: (Type[GenericMeta], Iterable[T]) -> MutableSet[T]
-        """Convert an iterable into a potentially generic set."""
-        if not cl.__args__ or cl.__args__[0] is Any:
-            return set(obj)
+    def _make_fromdict_fn(self, cl):
+        fn = make_dict_structure_fn(cl, self)
+        if self._interner is not None and is_internable(cl):
+            fn = self._interner.wrap(fn, cl)
+        return fn
+
+    def _conforming_classes(self, type_, handler):
+        # type: (Type, Callable) -> Optional[FrozenSet[Type]]
+        """Return the classes of values `handler` returns unchanged when
+        structuring them into `type_`, or ``None`` if values of any class may
+        be changed."""
+        if type_ not in _PRIMITIVE_TYPES:
+            return None
+        if handler in (self._structure_call, self._structure_trusted):
+            return frozenset([type_])
+        if handler == self._structure_unicode:
+            return frozenset([unicode, bytes])
+        return None
+
+    def _gen_passthrough(self, container, structure, classes,
+                         val_classes=Any):
+        # type: (Type, Callable, Any, Any) -> Callable
+        """Wrap a collection hook so collections whose elements are already
+        structured are copied at once, instead of element by element.
+
+        Elements are already structured if their exact class is in
+        `classes`; any element is if `classes` is ``Any``. For dicts,
+        `classes` applies to the keys and `val_classes` to the values. If
+        either is ``None``, elements always need structuring and `structure`
+        is returned. Only built-in collections are checked, since other
+        iterables may not be iterable twice; trusted converters skip the
+        check.
+
+        Structured tuples and frozensets of the exact `container` class are
+        returned as is. So are lists, sets and dicts, if the converter was
+        created with ``copy_collections=False``.
+        """
+        if classes is None or val_classes is None:
+            return structure
+        share = not self._copy_collections or container in (tuple, frozenset)
+        if classes is Any and val_classes is Any and not share:
+            # Copying is all the hook does.
+            return structure
+        if self._trusted:
+            # Elements are assumed to be structured already.
+            classes = val_classes = Any
+        checked = frozenset([dict]) if container is dict else _REITERABLE
+
+        def structure_passthrough(obj, cl):
+            if (obj.__class__ in checked and
+                    (classes is Any or set(map(type, obj)) <= classes) and
+                    (val_classes is Any or
+                     set(map(type, obj.values())) <= val_classes)):
+                if share and obj.__class__ is container:
+                    return obj
+                return container(obj)
+            return structure(obj, cl)
+        return structure_passthrough
+
+    def _gen_structure_list(self, cl):
+        # type: (Type[GenericMeta]) -> Callable[[Iterable, Type], List]
+        """Create a hook structuring iterables into potentially generic
+        lists."""
+        elem_type = _elem_type(cl)
+        if elem_type is None:
+            return self._gen_passthrough(list, _structure_list_any, Any)
+        handler = self._structure_func.dispatch(elem_type)
+        if handler == self._structure_call:
+            structure = lambda obj, _: list(map(elem_type, obj))  # noqa: E731
         else:
-            elem_type = cl.__args__[0]
-            return {self._structure_func.dispatch(elem_type)(e, elem_type)
-                    for e in obj}
-
-    def _structure_frozenset(self, obj, cl):
-        # type: (Type[GenericMeta], Iterable[T]) -> FrozenSet[T]
-        """Convert an iterable into a potentially generic frozenset."""
-        if not cl.__args__ or cl.__args__[0] is Any:
-            return frozenset(obj)
+            structure = lambda obj, _: [  # noqa: E731
+                handler(e, elem_type) for e in obj]
+        return self._gen_passthrough(
+            list, structure, self._conforming_classes(elem_type, handler))
+
+    def _gen_structure_set(self, cl):
+        # type: (Type[GenericMeta]) -> Callable[[Iterable, Type], MutableSet]
+        """Create a hook structuring iterables into potentially generic
+        sets."""
+        elem_type = _elem_type(cl)
+        if elem_type is None:
+            return self._gen_passthrough(set, _structure_set_any, Any)
+        handler = self._structure_func.dispatch(elem_type)
+        if handler == self._structure_call:
+            structure = lambda obj, _: set(map(elem_type, obj))  # noqa: E731
         else:
-            elem_type = cl.__args__[0]
-            dispatch = self._structure_func.dispatch
-            return frozenset(dispatch(elem_type)(e, elem_type) for e in obj)
+            structure = lambda obj, _: {  # noqa: E731
+                handler(e, elem_type) for e in obj}
+        return self._gen_passthrough(
+            set, structure, self._conforming_classes(elem_type, handler))
 
-    def _structure_dict(self, obj, cl):
-        # type: (Type[GenericMeta], Mapping[T, V]) -> Dict[T, V]
-        """Convert a mapping into a potentially generic dict."""
-        if not cl.__args__ or cl.__args__ == (Any, Any):
-            return dict(obj)
+    def _gen_structure_frozenset(self, cl):
+        # type: (Type[GenericMeta]) -> Callable[[Iterable, Type], FrozenSet]
+        """Create a hook structuring iterables into potentially generic
+        frozensets."""
+        elem_type = _elem_type(cl)
+        if elem_type is None:
+            return self._gen_passthrough(
+                frozenset, _structure_frozenset_any, Any)
+        handler = self._structure_func.dispatch(elem_type)
+        if handler == self._structure_call:
+            structure = lambda obj, _: frozenset(  # noqa: E731
+                map(elem_type, obj))
         else:
-            key_type, val_type = cl.__args__
-            if key_type is Any:
-                val_conv = self._structure_func.dispatch(val_type)
-                return {k: val_conv(v, val_type) for k, v in obj.items()}
-            elif val_type is Any:
-                key_conv = self._structure_func.dispatch(key_type)
-                return {key_conv(k, key_type): v for k, v in obj.items()}
-            else:
-                key_conv = self._structure_func.dispatch(key_type)
-                val_conv = self._structure_func.dispatch(val_type)
-                return {key_conv(k, key_type): val_conv(v, val_type)
-                        for k, v in obj.items()}
+            structure = lambda obj, _: frozenset([  # noqa: E731
+                handler(e, elem_type) for e in obj])
+        return self._gen_passthrough(
+            frozenset, structure, self._conforming_classes(elem_type, handler))
+
+    def _gen_structure_dict(self, cl):
+        # type: (Type[GenericMeta]) -> Callable[[Mapping, Type], Dict]
+        """Create a hook structuring mappings into potentially generic
+        dicts."""
+        args = getattr(cl, '__args__', None)
+        if not args or args == (Any, Any):
+            return self._gen_passthrough(dict, _structure_dict_any, Any)
+        key_type, val_type = args
+        dispatch = self._structure_func.dispatch
+        if key_type is Any:
+            val_conv = dispatch(val_type)
+            return self._gen_passthrough(
+                dict,
+                lambda obj, _: {k: val_conv(v, val_type)
+                                for k, v in obj.items()},
+                Any, self._conforming_classes(val_type, val_conv))
+        key_conv = dispatch(key_type)
+        key_classes = self._conforming_classes(key_type, key_conv)
+        if val_type is Any:
+            return self._gen_passthrough(
+                dict,
+                lambda obj, _: {key_conv(k, key_type): v
+                                for k, v in obj.items()},
+                key_classes)
+        val_conv = dispatch(val_type)
+        return self._gen_passthrough(
+            dict,
+            lambda obj, _: {key_conv(k, key_type): val_conv(v, val_type)
+                            for k, v in obj.items()},
+            key_classes, self._conforming_classes(val_type, val_conv))
 
     def _structure_union(self, obj, union):
         # type: (_Union, Any): -> Any
@@ -323,44 +1030,119 @@ class Converter(object):
         # We check for NoneType early and handle the case of obj being None,
         # so disambiguation functions don't need to handle NoneType.
         union_params = union.__args__
-        if NoneType in union_params:
-            if obj is None:
-                return None
-            if len(union_params) == 2:
-                # This is just a NoneType and something else.
-                other = (union_params[0] if union_params[1] is NoneType
-                         else union_params[1])
-                # We can't actually have a Union of a Union, so this is safe.
-                return self._structure_func.dispatch(other)(obj, other)
+        if NoneType in union_params and obj is None:
+            return None
 
         # Check the union registry first.
         handler = self._union_registry.get(union)
         if handler is not None:
             return handler(obj, union)
 
+        if NoneType in union_params and len(union_params) == 2:
+            # This is just a NoneType and something else.
+            other = (union_params[0] if union_params[1] is NoneType
+                     else union_params[1])
+            # We can't actually have a Union of a Union, so this is safe.
+            return self._structure_func.dispatch(other)(obj, other)
+
         # Getting here means either this is not an optional, or it's an
         # optional with more than one parameter.
-        # Let's support only unions of attr classes for now.
-        cl = self._dis_func_cache(union)(obj)
-        return self._structure_func.dispatch(cl)(obj, cl)
+        try:
+            fn = self._union_fns[union]
+        except KeyError:
+            fn = self._union_fns[union] = self._make_union_fn(union)
+        return fn(obj, union)
 
-    def _structure_tuple(self, obj, tup):
-        # type: (Type[Tuple], Iterable) -> Any
-        """Deal with converting to a tuple."""
-        tup_params = tup.__args__
+    def _make_union_fn(self, union):
+        # type: (Type) -> Callable[[Any, Type], Any]
+        """Create a function structuring a union, with ``None`` handled.
+
+        Unions of primitives are structured by the exact runtime type of the
+        value, if it's a member; otherwise each member is tried in order.
+        Other unions are supported if they only contain attrs classes.
+        """
+        members = [t for t in union.__args__ if t is not NoneType]
+        dispatch = self._structure_func.dispatch
+        if not all(t in _PRIMITIVE_TYPES for t in members):
+            dis_func = self._dis_func_cache(union)
+
+            def structure_attrs_union(obj, _):
+                cl = dis_func(obj)
+                return dispatch(cl)(obj, cl)
+            return structure_attrs_union
+
+        # Values of member types are passed through, unless they have hooks.
+        passthrough = (self._structure_call, self._structure_trusted,
+                       self._structure_unicode)
+        exact = {}
+        handlers = []
+        for t in members:
+            handler = dispatch(t)
+            handlers.append((handler, t))
+            exact[t] = None if handler in passthrough else handler
+
+        def structure_primitive_union(obj, _):
+            cl = obj.__class__
+            try:
+                handler = exact[cl]
+            except KeyError:
+                pass
+            else:
+                return obj if handler is None else handler(obj, cl)
+            for handler, t in handlers:
+                try:
+                    return handler(obj, t)
+                except (TypeError, ValueError):
+                    pass
+            raise ValueError('{0!r} can\'t be structured as {1}.'
+                             .format(obj, union))
+        return structure_primitive_union
+
+    def _gen_structure_optional(self, union):
+        # type: (Type) -> Callable[[Any, Type], Any]
+        """Create a structure hook for ``Optional[X]``, with the hook for
+        ``X``, or the hook registered for the union, resolved once. ``None``
+        is never passed to either."""
+        handler = self._union_registry.get(union)
+        if handler is not None:
+            cl = union
+        else:
+            args = union.__args__
+            cl = args[0] if args[1] is NoneType else args[1]
+            handler = self._structure_func.dispatch(cl)
+
+        def structure_optional(obj, _):
+            if obj is None:
+                return None
+            return handler(obj, cl)
+        return structure_optional
+
+    def _gen_structure_tuple(self, tup):
+        # type: (Type[Tuple]) -> Callable[[Iterable, Type], Tuple]
+        """Create a hook structuring iterables into potentially generic
+        tuples."""
+        tup_params = getattr(tup, '__args__', None)
         has_ellipsis = (tup_params and tup_params[-1] is Ellipsis)
         if tup_params is None or (has_ellipsis and tup_params[0] is Any):
             # Just a Tuple. (No generic information.)
-            return tuple(obj)
+            return self._gen_passthrough(tuple, _structure_tuple_any, Any)
+        dispatch = self._structure_func.dispatch
         if has_ellipsis:
             # We're dealing with a homogenous tuple, Tuple[int, ...]
             tup_type = tup_params[0]
-            conv = self._structure_func.dispatch(tup_type)
-            return tuple(conv(e, tup_type) for e in obj)
-        else:
-            # We're dealing with a heterogenous tuple.
-            return tuple(self._structure_func.dispatch(t)(e, t)
-                         for t, e in zip(tup_params, obj))
+            conv = dispatch(tup_type)
+            if conv == self._structure_call:
+                structure = lambda obj, _: tuple(  # noqa: E731
+                    map(tup_type, obj))
+            else:
+                structure = lambda obj, _: tuple([  # noqa: E731
+                    conv(e, tup_type) for e in obj])
+            return self._gen_passthrough(
+                tuple, structure, self._conforming_classes(tup_type, conv))
+        # We're dealing with a heterogenous tuple.
+        handlers = [(dispatch(t), t) for t in tup_params]
+        return lambda obj, _: tuple([handler(e, t) for (handler, t), e
+                                     in zip(handlers, obj)])
 
     def _get_dis_func(self, union):
         # type: (Type) -> Callable[..., Type]
@@ -369,4 +1151,4 @@ class Converter(object):
                    for e in union.__args__):
             raise ValueError('Only unions of attr classes supported '
                              'currently. Register a loads hook manually.')
-        return create_uniq_field_dis_func(*union.__args__)
+        return create_decision_tree_dis_func(*union.__args__)
@@ -1,11 +1,21 @@
 """Utilities for union (sum type) disambiguation."""
 from collections import OrderedDict
-from functools import reduce
+from enum import Enum
+from functools import partial, reduce
 from operator import or_
 
-from typing import Mapping
+from typing import AbstractSet, Any, Mapping, Sequence, Union
 
-from attr import fields
+import attr
+from attr import fields, NOTHING
+
+from ._compat import bytes, get_origin, int_types, is_py2, unicode
+from .gen import _compile_fn
+
+NoneType = type(None)
+
+# Past this many nodes, decision trees leave the rest to `_match`.
+_MAX_TREE_NODES = 256
 
 
 def create_uniq_field_dis_func(*cls):
@@ -47,3 +57,357 @@ def create_uniq_field_dis_func(*cls):
         return fallback
 
     return dis_func
+
+
+# The kinds of values told apart by decision trees.
+# In the order they're tested in.
+_KINDS = ('none', 'bool', 'int', 'float', 'str', 'bytes', 'seq', 'mapping',
+          'other')
+_ALL_KINDS = frozenset(_KINDS)
+
+_kinds_by_class = {
+    NoneType: 'none',
+    bool: 'bool',
+    float: 'float',
+    unicode: 'str',
+    bytes: 'bytes',
+    list: 'seq',
+    tuple: 'seq',
+    set: 'seq',
+    frozenset: 'seq',
+    dict: 'mapping',
+}
+for _t in int_types:
+    _kinds_by_class[_t] = 'int'
+
+
+def _value_kind(val):
+    # type: (Any) -> str
+    """Return the kind of an unstructured value."""
+    kind = _kinds_by_class.get(val.__class__)
+    if kind is not None:
+        return kind
+    for cl, kind in _kinds_by_class.items():
+        if cl is not NoneType and isinstance(val, cl):
+            return kind
+    if isinstance(val, Mapping):
+        return 'mapping'
+    if isinstance(val, (Sequence, AbstractSet)):
+        return 'seq'
+    return 'other'
+
+
+def _type_kinds(type_):
+    # type: (Any) -> FrozenSet[str]
+    """Return the kinds of values an attribute type may be structured from.
+
+    Types with unknown structuring rules accept all kinds.
+    """
+    if type_ is None or type_ is Any:
+        return _ALL_KINDS
+    if type_ is NoneType:
+        return frozenset(['none'])
+    if get_origin(type_) is Union:
+        return frozenset().union(*[_type_kinds(t) for t in type_.__args__])
+    if getattr(type_, '__attrs_attrs__', None) is not None:
+        return frozenset(['mapping', 'seq'])
+    origin = get_origin(type_)
+    cl = origin if isinstance(origin, type) else type_
+    if not isinstance(cl, type):
+        return _ALL_KINDS
+    if issubclass(cl, Enum):
+        return frozenset(_value_kind(m.value) for m in cl)
+    if issubclass(cl, (unicode, bytes)):
+        if is_py2:
+            # Text and bytes are interchangeable.
+            return frozenset(['str', 'bytes'])
+        return frozenset(['str' if issubclass(cl, unicode) else 'bytes'])
+    if cl is bool:
+        return frozenset(['bool'])
+    if cl in int_types:
+        return frozenset(['int'])
+    if cl is float:
+        return frozenset(['int', 'float'])
+    if issubclass(cl, Mapping):
+        return frozenset(['mapping'])
+    if issubclass(cl, (Sequence, AbstractSet)):
+        return frozenset(['seq'])
+    return _ALL_KINDS
+
+
+@attr.s(slots=True)
+class _Node(object):
+    """A decision tree node.
+
+    Leaves return a class. Other nodes test the presence of a key, the
+    kind of its value, or both. Keys known to be present have no `absent`
+    branch.
+    """
+    leaf = attr.ib(default=None)
+    key = attr.ib(default=None)
+    kind_branches = attr.ib(default=())  # Pairs of kinds and nodes.
+    present = attr.ib(default=None)  # For present keys of any other kind.
+    absent = attr.ib(default=None)
+    # Candidates told apart when the tree is used, for trees too big to
+    # build in full.
+    candidates = attr.ib(default=None)
+
+
+def _fewest_fields(specs, candidates):
+    """Pick the candidate with the fewest fields."""
+    fewest = min(len(specs[c]) for c in candidates)
+    return _Node(leaf=[c for c in candidates if len(specs[c]) == fewest][-1])
+
+
+def _kind_groups(specs, candidates, key):
+    """Group the candidates by the kinds of values they accept for a key."""
+    groups = OrderedDict()
+    for kind in _KINDS:
+        group = tuple(c for c in candidates if kind in specs[c][key][0])
+        if group:
+            groups.setdefault(group, []).append(kind)
+    return groups
+
+
+def _match(specs, candidates, data):
+    # type: (Mapping, Tuple[Type, ...], Mapping) -> Type
+    """Pick the candidate matching the data, like a decision tree would.
+
+    The candidates with all the keys of the data, and all their required
+    fields present, are preferred; then those accepting the kinds of the
+    values. Ties go to the candidate with the fewest fields.
+    """
+    keys = [k for k in data if any(k in specs[c] for c in candidates)]
+    for test in (lambda c: all(k in specs[c] for k in keys),
+                 lambda c: all(k in data for k, (_, optional)
+                               in specs[c].items() if not optional),
+                 lambda c: all(_value_kind(data[k]) in specs[c][k][0]
+                               for k in keys)):
+        matching = tuple(c for c in candidates if test(c))
+        if not matching:
+            break
+        candidates = matching
+    return _fewest_fields(specs, candidates).leaf
+
+
+def _build_tree(specs, candidates, keys, known, cache):
+    # type: (Mapping, Tuple, Tuple[str, ...], FrozenSet[str], dict) -> _Node
+    """Build a decision tree telling the candidate classes apart.
+
+    `keys` haven't been tested yet; `known` are keys known to be present,
+    the kinds of which haven't been tested yet.
+
+    The presence of keys is tested first, the key splitting the candidates
+    best going first, so data with only the fields of one class goes to it.
+    The kinds of values only tell apart candidates with the same fields.
+    Data matching none of the candidates of a branch (a key required by
+    every candidate being absent) goes to the candidate with the fewest
+    fields. Values of unexpected kinds go on to the remaining tests.
+
+    Past `_MAX_TREE_NODES` nodes, the remaining candidates are told apart
+    by `_match` instead.
+    """
+    # Keys the candidates agree on can't tell them apart.
+    keys = tuple(k for k in keys
+                 if len(set(specs[c].get(k) for c in candidates)) > 1)
+    known = frozenset(k for k in known
+                      if len(set(specs[c][k][0] for c in candidates)) > 1)
+    try:
+        return cache[candidates, keys, known]
+    except KeyError:
+        pass
+    if len(cache) >= _MAX_TREE_NODES and (keys or known):
+        return _Node(candidates=candidates)
+    best = None
+    for key in keys:
+        present = tuple(c for c in candidates if key in specs[c])
+        absent = tuple(c for c in candidates
+                       if key not in specs[c] or specs[c][key][1])
+        # Branches for data matching no candidate don't count.
+        branches = [b for b in (present, absent) if b]
+        if all(b == candidates for b in branches):
+            continue
+        score = (max(len(b) for b in branches),
+                 sum(len(b) for b in branches))
+        if best is None or score < best[0]:
+            best = (score, key, present, absent)
+
+    if best is not None:
+        _, key, present, absent = best
+        rest = tuple(k for k in keys if k != key)
+        res = _Node(key=key)
+        res.present = _build_tree(specs, present, rest, known | {key},
+                                  cache)
+        if absent:
+            res.absent = _build_tree(specs, absent, rest, known, cache)
+        else:
+            res.absent = _fewest_fields(specs, candidates)
+    else:
+        # All candidates have the remaining keys; test the kinds of their
+        # values.
+        for key in keys + tuple(sorted(known)):
+            groups = _kind_groups(specs, candidates, key)
+            score = (max(len(g) for g in groups), sum(len(g) for g in groups))
+            if best is None or score < best[0]:
+                best = (score, key, groups)
+
+        if best is None:
+            # The remaining keys can't tell the candidates apart.
+            res = _fewest_fields(specs, candidates)
+        else:
+            _, key, groups = best
+            rest = tuple(k for k in keys if k != key)
+            rest_known = known - {key}
+            res = _Node(key=key)
+            res.kind_branches = [
+                (kinds, _build_tree(specs, group, rest, rest_known, cache))
+                for group, kinds in groups.items()]
+            res.present = _build_tree(specs, candidates, rest, rest_known,
+                                      cache)
+            if key in keys:
+                if all(specs[c][key][1] for c in candidates):
+                    res.absent = res.present
+                else:
+                    res.absent = _fewest_fields(specs, candidates)
+    cache[candidates, keys, known] = res
+    return res
+
+
+def _count_refs(node, refs):
+    """Count the references to each node of a tree, by node id."""
+    refs[id(node)] = refs.get(id(node), 0) + 1
+    if refs[id(node)] > 1 or node.key is None:
+        return
+    for _, child in node.kind_branches:
+        _count_refs(child, refs)
+    _count_refs(node.present, refs)
+    if node.absent is not None:
+        _count_refs(node.absent, refs)
+
+
+class _TreeEmitter(object):
+    """Compiles decision trees.
+
+    Nodes shared by several branches are compiled once, into functions of
+    their own, keeping the code linear in the number of distinct nodes.
+    """
+
+    def __init__(self, cls, specs, refs, globs):
+        self.cl = cls[0]
+        self.specs = specs
+        self.refs = refs
+        self.globs = globs
+        self.cl_names = {}
+        self.fn_names = {}
+        for i, cl in enumerate(cls):
+            self.cl_names[cl] = '__c{0}'.format(i)
+            globs[self.cl_names[cl]] = cl
+
+    def _return(self, node):
+        """Return a single statement returning the node's result, if any."""
+        if node.leaf is not None:
+            return 'return {0}'.format(self.cl_names[node.leaf])
+        if node.candidates is None and self.refs[id(node)] == 1:
+            return None
+        fn_name = self.fn_names.get(id(node))
+        if fn_name is None:
+            fn_name = '__n{0}'.format(len(self.fn_names))
+            self.fn_names[id(node)] = fn_name
+            if node.candidates is not None:
+                fn = partial(_match, self.specs, node.candidates)
+            else:
+                lines = ['def {0}(data):'.format(fn_name)]
+                self._emit_node(node, 1, lines)
+                fn = _compile_fn(self.cl, fn_name, lines, self.globs)
+            self.globs[fn_name] = fn
+        return 'return {0}(data)'.format(fn_name)
+
+    def emit(self, node, depth, lines):
+        """Append the code for a decision tree node to `lines`."""
+        ret = self._return(node)
+        if ret is not None:
+            lines.append('    ' * depth + ret)
+        else:
+            self._emit_node(node, depth, lines)
+
+    def _emit_node(self, node, depth, lines):
+        """Append the code of a node's tests to `lines`.
+
+        Every branch returns, so one branch of each test is emitted after
+        the ``if`` instead of in an ``else``, keeping the nesting shallow.
+        """
+        indent = '    ' * depth
+        key = repr(node.key)
+        if node.absent is None:
+            self._emit_present(node, depth, lines)
+        elif self._return(node.absent) is not None and (
+                node.kind_branches or self._return(node.present) is None):
+            lines.append('{0}if {1} not in data:'.format(indent, key))
+            self.emit(node.absent, depth + 1, lines)
+            self._emit_present(node, depth, lines)
+        else:
+            lines.append('{0}if {1} in data:'.format(indent, key))
+            self._emit_present(node, depth + 1, lines)
+            self.emit(node.absent, depth, lines)
+
+    def _emit_present(self, node, depth, lines):
+        """Append the code for a node's key being present to `lines`."""
+        indent = '    ' * depth
+        if node.kind_branches:
+            lines.append('{0}kind = __kind(data[{1!r}])'
+                         .format(indent, node.key))
+            for kinds, child in node.kind_branches:
+                kinds_name = '__k{0}'.format(len(self.globs))
+                self.globs[kinds_name] = frozenset(kinds)
+                lines.append('{0}if kind in {1}:'.format(indent, kinds_name))
+                self.emit(child, depth + 1, lines)
+        self.emit(node.present, depth, lines)
+
+
+def create_decision_tree_dis_func(*cls):
+    # type: (*Sequence[Type]) -> Callable
+    """Given attr classes, generate a disambiguation function.
+
+    The function is compiled from a decision tree testing the presence of
+    keys, and the kinds of their values (strings, numbers, sequences,
+    mappings...) as inferred from the attribute types. Classes don't need
+    unique fields; only classes with the same fields, of the same kinds,
+    are rejected. A lookup costs at most one test per key.
+
+    Data with only the fields of one class is assigned to it, whatever the
+    kinds of the values. Data the classes can't be told apart by, like a
+    mapping with only the fields common to two classes, is assigned to the
+    class with the fewest fields. Classes sharing many optional fields can
+    make for big trees; past a few hundred nodes, the remaining classes
+    are told apart by testing them one by one.
+    """
+    if len(cls) < 2:
+        raise ValueError('At least two classes required.')
+    # Per class, the kinds of values and optionality of each field.
+    specs = OrderedDict()
+    keys = []
+    for cl in cls:
+        spec = {}
+        for a in fields(cl):
+            optional = a.default is not NOTHING or not a.init
+            spec[a.name] = (_type_kinds(a.type) if a.init else _ALL_KINDS,
+                            optional)
+            if a.name not in keys:
+                keys.append(a.name)
+        for other, other_spec in specs.items():
+            if spec == other_spec:
+                raise ValueError('{0} and {1} can\'t be told apart.'
+                                 .format(other, cl))
+        specs[cl] = spec
+
+    root = _build_tree(specs, tuple(cls), tuple(keys), frozenset(), {})
+    refs = {}
+    _count_refs(root, refs)
+    globs = {'__Mapping': Mapping, '__kind': _value_kind}
+    emitter = _TreeEmitter(cls, specs, refs, globs)
+    func_name = 'dis_func'
+    lines = ['def {0}(data):'.format(func_name),
+             '    if not isinstance(data, __Mapping):',
+             "        raise ValueError('Only input mappings are supported.')"]
+    emitter.emit(root, 1, lines)
+    return _compile_fn(cls[0], func_name, lines, globs)
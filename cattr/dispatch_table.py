@@ -0,0 +1,115 @@
+"""Type-keyed tables caching dispatch results."""
+from collections import namedtuple, OrderedDict
+from enum import Enum
+from threading import Lock
+
+
+CacheInfo = namedtuple('CacheInfo',
+                       ['hits', 'misses', 'maxsize', 'currsize', 'generation'])
+
+
+class EvictionPolicy(Enum):
+    """Which entry a bounded dispatch table evicts when full."""
+    LRU = "lru"
+    FIFO = "fifo"
+
+
+class _Table(dict):
+    """A dict calling back into its owner on missing keys."""
+    __slots__ = ('_owner',)
+
+    def __missing__(self, key):
+        return self._owner._miss(key)
+
+
+class DispatchTable(object):
+    """
+    DispatchTable caches the results of a resolver function, keyed by type.
+
+    Unbounded tables without statistics look up types using a plain dict;
+    ``dispatch`` is the dict's own ``__getitem__``. Bounded tables evict
+    entries according to their policy once ``maxsize`` is reached. Their
+    bookkeeping is done under a lock, so they can be shared by threads; the
+    resolver runs outside of it.
+
+    Clearing the table increments its generation, so holders of derived
+    data can tell it has been invalidated.
+    """
+    __slots__ = ('_resolve', '_table', '_lock', '_hits', '_misses',
+                 'maxsize', 'policy', 'stats', 'generation', 'dispatch')
+
+    def __init__(self, resolve, maxsize=None, policy=EvictionPolicy.LRU,
+                 stats=False):
+        self._resolve = resolve
+        self.maxsize = maxsize
+        self.policy = EvictionPolicy(policy)
+        self.stats = stats
+        self.generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+        if maxsize is None and not stats:
+            self._table = _Table()
+            self._table._owner = self
+            self.dispatch = self._table.__getitem__
+        else:
+            self._table = OrderedDict()
+            self.dispatch = self._dispatch
+
+    def _dispatch(self, typ):
+        """Look up `typ`, keeping track of statistics and recency."""
+        table = self._table
+        with self._lock:
+            try:
+                res = table[typ]
+            except KeyError:
+                pass
+            else:
+                self._hits += 1
+                if (self.policy is EvictionPolicy.LRU and
+                        self.maxsize is not None):
+                    # Re-insert the entry to mark it as the most recently
+                    # used.
+                    del table[typ]
+                    table[typ] = res
+                return res
+        return self._miss(typ)
+
+    def _miss(self, typ):
+        res = self._resolve(typ)
+        table = self._table
+        if self.maxsize is None and not self.stats:
+            # Plain dict operations don't need the lock.
+            self._misses += 1
+            table[typ] = res
+            return res
+        with self._lock:
+            self._misses += 1
+            if self.maxsize is not None:
+                if self.maxsize <= 0:
+                    return res
+                table.pop(typ, None)
+                while len(table) >= self.maxsize:
+                    table.popitem(last=False)
+            table[typ] = res
+        return res
+
+    def clear(self):
+        """Drop all cached entries and start a new generation."""
+        with self._lock:
+            self._table.clear()
+            self._hits = 0
+            self._misses = 0
+            self.generation += 1
+
+    def cache_info(self):
+        # type: () -> CacheInfo
+        """Report the table statistics.
+
+        Hits are only counted by bounded tables, and tables created with
+        ``stats=True``; otherwise they are reported as ``None``.
+        """
+        hits = (self._hits if self.maxsize is not None or self.stats
+                else None)
+        return CacheInfo(hits, self._misses, self.maxsize, len(self._table),
+                         self.generation)
@@ -1,4 +1,37 @@
-from ._compat import lru_cache
+from heapq import merge
+
+from ._compat import get_origin
+from .dispatch_table import DispatchTable, EvictionPolicy
+
+
+class _IndexKey(object):
+    """A named index key for properties not represented by a class."""
+    __slots__ = ('_name',)
+
+    def __init__(self, name):
+        self._name = name
+
+    def __repr__(self):
+        return self._name
+
+
+#: The index key of predicates handling ``attrs`` classes.
+ATTRS_CLASS = _IndexKey('ATTRS_CLASS')
+
+
+def index_keys(typ):
+    """
+    returns the index keys a type can be found under: the type itself,
+    its typing origin (``list`` for ``List[int]``, ``Union`` for unions)
+    and ``ATTRS_CLASS`` for ``attrs`` classes.
+    """
+    keys = [typ]
+    origin = get_origin(typ)
+    if origin is not None:
+        keys.append(origin)
+    if getattr(typ, '__attrs_attrs__', None) is not None:
+        keys.append(ATTRS_CLASS)
+    return keys
 
 
 class FunctionDispatch(object):
@@ -8,28 +41,73 @@ class FunctionDispatch(object):
     first argument in the method, and return True or False.
 
     objects that help determine dispatch should be instantiated objects.
+
+    A function may be registered with an index key (see ``index_keys``);
+    it is then only evaluated for types found under that key. Functions
+    without a key are evaluated for every type.
+
+    If registered as a factory, the handler is called with the type and
+    returns the actual handler, so handlers can be specialized per type.
+
+    The keyword arguments configure the table caching dispatch results.
     """
-    __slots__ = ('_handler_pairs', 'dispatch')
+    __slots__ = ('_indexed', '_opaque', '_counter', '_cache', 'dispatch')
+
+    def __init__(self, maxsize=None, policy=EvictionPolicy.LRU, stats=False):
+        # Entries are (-registration counter, can_handle, handler,
+        # is_factory), so sorted lists put the most recently registered
+        # entries first.
+        self._indexed = {}
+        self._opaque = []
+        self._counter = 0
+        self._cache = DispatchTable(self._dispatch, maxsize=maxsize,
+                                    policy=policy, stats=stats)
+        self.dispatch = self._cache.dispatch
 
-    def __init__(self):
-        self._handler_pairs = []
-        self.dispatch = lru_cache(64)(self._dispatch)
+    def register(self, can_handle, func, key=None, is_factory=False):
+        self._counter += 1
+        entry = (-self._counter, can_handle, func, is_factory)
+        if key is None:
+            self._opaque.insert(0, entry)
+        else:
+            self._indexed.setdefault(key, []).insert(0, entry)
+        self._cache.clear()
 
-    def register(self, can_handle, func):
-        self._handler_pairs.insert(0, (can_handle, func))
-        self.dispatch.cache_clear()
+    def clear_cache(self):
+        """Drop the cached handlers, for example made by factories."""
+        self._cache.clear()
+
+    def cache_info(self):
+        # type: () -> CacheInfo
+        """Report the statistics of the dispatch cache."""
+        return self._cache.cache_info()
 
     def _dispatch(self, typ):
         """
         returns the appropriate handler, for the object passed.
         """
-        for can_handle, handler in self._handler_pairs:
+        buckets = []
+        for key in index_keys(typ):
+            try:
+                bucket = self._indexed.get(key)
+            except TypeError:
+                # Unhashable keys can't be in the index.
+                continue
+            if bucket:
+                buckets.append(bucket)
+        if buckets:
+            # Preserve the registration order across the candidates.
+            entries = merge(self._opaque, *buckets)
+        else:
+            entries = self._opaque
+        for _, can_handle, handler, is_factory in entries:
             # can handle could raise an exception here
             # such as issubclass being called on an instance.
             # it's easier to just ignore that case.
             try:
-                if can_handle(typ):
-                    return handler
+                if not can_handle(typ):
+                    continue
             except Exception:
-                pass
+                continue
+            return handler(typ) if is_factory else handler
         raise KeyError("unable to find handler for {0}".format(typ))
@@ -0,0 +1,306 @@
+"""Code generation of specialized, per-class converter functions."""
+import linecache
+import uuid
+
+from attr import NOTHING
+
+from ._compat import get_origin
+
+
+def _generate_unique_filename(cl, func_name):
+    """Create a "filename" suitable for a function being generated."""
+    return "<cattrs generated {0} {1}.{2}-{3}>".format(
+        func_name,
+        cl.__module__,
+        getattr(cl, '__qualname__', cl.__name__),
+        uuid.uuid4(),
+    )
+
+
+def _compile_fn(cl, func_name, lines, globs):
+    """Compile the generated source and return the function object.
+
+    The source is also registered with ``linecache``, so tracebacks and
+    debuggers can display it.
+    """
+    script = '\n'.join(lines) + '\n'
+    fname = _generate_unique_filename(cl, func_name)
+    bytecode = compile(script, fname, 'exec')
+    locs = {}
+    eval(bytecode, globs, locs)
+    linecache.cache[fname] = (
+        len(script), None, script.splitlines(True), fname
+    )
+    return locs[func_name]
+
+
+def _is_plain_class(type_):
+    """Is the type a class values can be instances of exactly?
+
+    Typing generics like ``List[int]`` are classes on some Pythons, but no
+    value has them as its class.
+    """
+    return isinstance(type_, type) and get_origin(type_) is None
+
+
+def _is_identity(handler, converter):
+    """Is the unstructure handler the converter's passthrough function?"""
+    return handler == converter._unstructure_identity
+
+
+def _unstructure_field_expr(a, i, converter, globs):
+    # type: (Attribute, int, Converter, dict) -> str
+    """Return an expression unstructuring the value in the local ``v{i}``.
+
+    If the field type is a class, its hook is resolved now and bound into
+    the generated function. Since unstructuring dispatches on the runtime
+    class, the pre-bound hook is only used if the value is exactly of the
+    declared class; otherwise we fall back to a dispatcher lookup.
+    """
+    val = 'v{0}'.format(i)
+    fallback = '__dispatch({0}.__class__)({0})'.format(val)
+    type_ = a.type
+    if not _is_plain_class(type_):
+        # Untyped, or a typing construct. Dispatch on the runtime class.
+        return fallback
+    handler = converter._unstructure_func.dispatch(type_)
+    type_name = '__t{0}'.format(i)
+    globs[type_name] = type_
+    if _is_identity(handler, converter):
+        hit = val
+    else:
+        handler_name = '__h{0}'.format(i)
+        globs[handler_name] = handler
+        hit = '{0}({1})'.format(handler_name, val)
+    return '{0} if {1}.__class__ is {2} else {3}'.format(
+        hit, val, type_name, fallback
+    )
+
+
+def make_dict_unstructure_fn(cl, converter):
+    # type: (Type, Converter) -> Callable[[Any], Mapping]
+    """Generate a function unstructuring instances of `cl` into dicts.
+
+    The function is straight-line code with the field names inlined.
+    """
+    func_name = 'unstructure_asdict'
+    globs = {'__dispatch': converter._unstructure_func.dispatch}
+    lines = ['def {0}(obj):'.format(func_name)]
+    attrs = cl.__attrs_attrs__
+    for i, a in enumerate(attrs):
+        lines.append('    v{0} = obj.{1}'.format(i, a.name))
+    exprs = [(a.name, _unstructure_field_expr(a, i, converter, globs))
+             for i, a in enumerate(attrs)]
+
+    if converter._dict_factory is dict:
+        # Dict literals are the fastest option.
+        lines.append('    return {')
+        for name, expr in exprs:
+            lines.append('        {0!r}: {1},'.format(name, expr))
+        lines.append('    }')
+    else:
+        globs['__dict_factory'] = converter._dict_factory
+        lines.append('    res = __dict_factory()')
+        for name, expr in exprs:
+            lines.append('    res[{0!r}] = {1}'.format(name, expr))
+        lines.append('    return res')
+    return _compile_fn(cl, func_name, lines, globs)
+
+
+def _structure_field_expr(a, i, val, converter, globs):
+    # type: (Attribute, int, str, Converter, dict) -> Tuple[Optional[str], str]
+    """Return an expression structuring `val` into the attribute's type.
+
+    The structure hook for the attribute type is resolved now and bound into
+    the generated function. Expressions using the value more than once
+    come with a statement binding it to the local ``v{i}``, to be executed
+    first; otherwise the statement is ``None``.
+    """
+    type_ = a.type
+    if type_ is None:
+        # No type metadata, pass the value through.
+        return None, val
+    type_name = '__t{0}'.format(i)
+    globs[type_name] = type_
+    handler = converter._structure_func.dispatch(type_)
+    if handler == converter._structure_call:
+        # Skip the indirection, just call the type.
+        return None, '{0}({1})'.format(type_name, val)
+    if handler == converter._structure_trusted:
+        local = 'v{0}'.format(i)
+        return ('{0} = {1}'.format(local, val),
+                '({1} if {1}.__class__ is {0} else {0}({1}))'.format(
+                    type_name, local))
+    handler_name = '__h{0}'.format(i)
+    globs[handler_name] = handler
+    return None, '{0}({1}, {2})'.format(handler_name, val, type_name)
+
+
+def _bind(binding, indent, lines):
+    """Append the statement binding a field value, if any, to `lines`."""
+    if binding is not None:
+        lines.append(indent + binding)
+
+
+def _trusted_instance_check(converter, lines):
+    """For trusted converters, append code returning instances of the class
+    (bound to ``__cl``) untouched."""
+    if converter._trusted:
+        lines.append('    if o.__class__ is __cl:')
+        lines.append('        return o')
+
+
+def _check_required(cl, keys, o):
+    """Raise a `TypeError` naming the required keys missing from `o`, if
+    any."""
+    missing = [k for k in keys if k not in o]
+    if missing:
+        raise TypeError('{0} is missing required fields: {1}'.format(
+            cl.__name__, ', '.join(repr(k) for k in missing)))
+
+
+def make_dict_structure_fn(cl, converter):
+    # type: (Type, Converter) -> Callable[[Mapping, Type], Any]
+    """Generate a function structuring mappings into instances of `cl`.
+
+    The function has the signature of a structure hook. Attributes with
+    defaults are only passed to `cl` if present in the mapping; keys not
+    matching any attribute are ignored. Missing required keys raise a
+    `TypeError`, like calling `cl` without them would.
+    """
+    func_name = 'structure_fromdict'
+    globs = {'__cl': cl, '__check_required': _check_required}
+    lines = ['def {0}(o, _):'.format(func_name)]
+    _trusted_instance_check(converter, lines)
+    required = []
+    optional = []
+    for i, a in enumerate(cl.__attrs_attrs__):
+        if not a.init:
+            continue
+        # attrs strips leading underscores from __init__ argument names.
+        arg_name = a.name.lstrip('_')
+        key = repr(a.name)
+        binding, expr = _structure_field_expr(
+            a, i, 'o[{0}]'.format(key), converter, globs)
+        if a.default is NOTHING:
+            required.append((a.name, arg_name, binding, expr))
+        else:
+            optional.append((key, arg_name, binding, expr))
+
+    if required:
+        # Required keys are looked up unchecked; a KeyError is turned into
+        # a TypeError if one of them is missing.
+        globs['__required'] = tuple(r[0] for r in required)
+        lines.append('    try:')
+        indent = '        '
+    else:
+        indent = '    '
+    for _, _, binding, _ in required:
+        _bind(binding, indent, lines)
+    if not optional:
+        lines.append('{0}return __cl('.format(indent))
+        for _, arg_name, _, expr in required:
+            lines.append('{0}    {1}={2},'.format(indent, arg_name, expr))
+        lines.append('{0})'.format(indent))
+    else:
+        lines.append('{0}res = {{'.format(indent))
+        for _, arg_name, _, expr in required:
+            lines.append('{0}    {1!r}: {2},'.format(indent, arg_name, expr))
+        lines.append('{0}}}'.format(indent))
+    if required:
+        lines.append('    except KeyError:')
+        lines.append('        __check_required(__cl, __required, o)')
+        lines.append('        raise')
+    if optional:
+        for key, arg_name, binding, expr in optional:
+            lines.append('    if {0} in o:'.format(key))
+            _bind(binding, '        ', lines)
+            lines.append('        res[{0!r}] = {1}'.format(arg_name, expr))
+        lines.append('    return __cl(**res)')
+    return _compile_fn(cl, func_name, lines, globs)
+
+
+def make_tuple_unstructure_fn(cl, converter):
+    # type: (Type, Converter) -> Callable[[Any], Tuple]
+    """Generate a function unstructuring instances of `cl` into tuples."""
+    func_name = 'unstructure_astuple'
+    globs = {'__dispatch': converter._unstructure_func.dispatch}
+    lines = ['def {0}(obj):'.format(func_name)]
+    attrs = cl.__attrs_attrs__
+    for i, a in enumerate(attrs):
+        lines.append('    v{0} = obj.{1}'.format(i, a.name))
+    lines.append('    return (')
+    for i, a in enumerate(attrs):
+        lines.append('        {0},'.format(
+            _unstructure_field_expr(a, i, converter, globs)))
+    lines.append('    )')
+    return _compile_fn(cl, func_name, lines, globs)
+
+
+def make_tuple_structure_fn(cl, converter):
+    # type: (Type, Converter) -> Callable[[Sequence, Type], Any]
+    """Generate a function structuring sequences into instances of `cl`.
+
+    The function has the signature of a structure hook. Values are matched
+    to attributes by position and passed to `cl` positionally. If the
+    sequence is too short, the trailing attributes use their defaults.
+    """
+    func_name = 'structure_fromtuple'
+    globs = {'__cl': cl}
+    lines = ['def {0}(o, _):'.format(func_name)]
+    _trusted_instance_check(converter, lines)
+    attrs = cl.__attrs_attrs__
+    args = []
+    first_default = None
+    for i, a in enumerate(attrs):
+        if not a.init:
+            continue
+        if first_default is None and a.default is not NOTHING:
+            first_default = len(args)
+        args.append((i,) + _structure_field_expr(
+            a, i, 'o[{0}]'.format(i), converter, globs))
+
+    if first_default is None:
+        for _, binding, _ in args:
+            _bind(binding, '    ', lines)
+        lines.append('    return __cl(')
+        for _, _, expr in args:
+            lines.append('        {0},'.format(expr))
+        lines.append('    )')
+    else:
+        # Values always present are bound once, for both branches.
+        for _, binding, _ in args[:first_default]:
+            _bind(binding, '    ', lines)
+        lines.append('    n = len(o)')
+        lines.append('    if n >= {0}:'.format(len(attrs)))
+        for _, binding, _ in args[first_default:]:
+            _bind(binding, '        ', lines)
+        lines.append('        return __cl(')
+        for _, _, expr in args:
+            lines.append('            {0},'.format(expr))
+        lines.append('        )')
+        lines.append('    args = [')
+        for _, _, expr in args[:first_default]:
+            lines.append('        {0},'.format(expr))
+        lines.append('    ]')
+        for i, binding, expr in args[first_default:]:
+            lines.append('    if n > {0}:'.format(i))
+            _bind(binding, '        ', lines)
+            lines.append('        args.append({0})'.format(expr))
+        lines.append('    return __cl(*args)')
+    return _compile_fn(cl, func_name, lines, globs)
+
+
+def make_kwargs_init_fn(cl, arg_names):
+    # type: (Type, Sequence[str]) -> Callable[..., Any]
+    """Generate a function taking positional arguments and passing them
+    to `cl` as the given keyword arguments.
+    """
+    func_name = 'init_kwargs'
+    params = ['a{0}'.format(i) for i in range(len(arg_names))]
+    lines = ['def {0}({1}):'.format(func_name, ', '.join(params)),
+             '    return __cl(']
+    for name, param in zip(arg_names, params):
+        lines.append('        {0}={1},'.format(name, param))
+    lines.append('    )')
+    return _compile_fn(cl, func_name, lines, {'__cl': cl})
@@ -0,0 +1,300 @@
+"""Writing and reading JSON text directly to and from structured data."""
+import codecs
+import json
+import re
+from json.encoder import encode_basestring_ascii
+
+from ._compat import bytes, int_types, is_py2, isfinite, unicode
+from .dispatch_table import DispatchTable
+from .gen import _compile_fn
+
+NoneType = type(None)
+
+# Types written as JSON strings.
+string_types = (unicode, bytes) if is_py2 else (unicode,)
+
+
+# The json module's spelling of special floats.
+_float_specials = {'nan': 'NaN', 'inf': 'Infinity', '-inf': '-Infinity'}
+
+
+def _float_str(o):
+    """Format a float the way the ``json`` module does."""
+    r = float.__repr__(o)
+    return _float_specials.get(r, r)
+
+
+def _int_str(o):
+    return str(int(o))
+
+
+def _bool_str(o):
+    return 'true' if o else 'false'
+
+
+# Functions formatting values of exactly these types, used by the generated
+# functions for fields of primitive types.
+_primitive_formatters = {
+    int: int.__repr__,
+    float: float.__repr__,
+    bool: _bool_str,
+}
+for _t in string_types:
+    _primitive_formatters[_t] = encode_basestring_ascii
+
+
+def _key_str(key):
+    """Format a mapping key the way the ``json`` module does."""
+    if isinstance(key, string_types):
+        return encode_basestring_ascii(key)
+    if key is True or key is False:
+        return '"{0}"'.format(_bool_str(key))
+    if key is None:
+        return '"null"'
+    if isinstance(key, int_types):
+        return '"{0}"'.format(_int_str(key))
+    if isinstance(key, float):
+        return '"{0}"'.format(_float_str(key))
+    raise TypeError('Keys must be str, int, float, bool or None, '
+                    'not {0}.'.format(key.__class__.__name__))
+
+
+def _null_str(o):
+    return 'null'
+
+
+def _not_serializable(o):
+    raise TypeError('Object of type {0} is not JSON serializable.'
+                    .format(o.__class__.__name__))
+
+
+def make_json_encode_fn(cl, converter, encoder, as_tuple=False):
+    # type: (Type, Converter, JsonEncoder, bool) -> Callable[[Any], str]
+    """Generate a function encoding instances of `cl` as JSON text.
+
+    Instances are encoded as objects, or as arrays if `as_tuple` is true.
+    Fields typed as primitives are formatted inline; other values use the
+    encoder.
+    """
+    func_name = 'encode_json'
+    globs = {'__encode_for': encoder.dispatch}
+    lines = ['def {0}(obj):'.format(func_name)]
+    attrs = cl.__attrs_attrs__
+    template = []
+    exprs = []
+    for i, a in enumerate(attrs):
+        if not as_tuple:
+            template.append(encode_basestring_ascii(a.name)
+                            .replace('%', '%%') + ':')
+        template.append('%s')
+        template.append(',')
+        val = 'v{0}'.format(i)
+        lines.append('    {0} = obj.{1}'.format(val, a.name))
+        expr = '__encode_for({0}.__class__)({0})'.format(val)
+        type_ = a.type
+        formatter = _primitive_formatters.get(type_)
+        if (formatter is not None and
+                converter._unstructure_func.dispatch(type_) ==
+                converter._unstructure_identity):
+            type_name = '__t{0}'.format(i)
+            formatter_name = '__f{0}'.format(i)
+            globs[type_name] = type_
+            globs[formatter_name] = formatter
+            check = '{0}.__class__ is {1}'.format(val, type_name)
+            if type_ is float:
+                # Special floats are spelled differently; leave them to
+                # the encoder.
+                globs['__isfinite'] = isfinite
+                check += ' and __isfinite({0})'.format(val)
+            expr = '{0}({1}) if {2} else {3}'.format(
+                formatter_name, val, check, expr)
+        exprs.append(expr)
+    if template:
+        template.pop()
+    template = ''.join(['['] + template + [']'] if as_tuple
+                       else ['{'] + template + ['}'])
+    if not exprs:
+        lines.append('    return {0!r}'.format(template))
+    else:
+        lines.append('    return {0!r} % ('.format(template))
+        for expr in exprs:
+            lines.append('        {0},'.format(expr))
+        lines.append('    )')
+    return _compile_fn(cl, func_name, lines, globs)
+
+
+class JsonEncoder(object):
+    """
+    JsonEncoder encodes objects as JSON text, using a converter's
+    unstructure hooks.
+
+    An encoding function is resolved once per class and cached. ``attrs``
+    classes unstructured by the converter's default strategies get
+    generated functions; values of types with custom hooks are encoded by
+    encoding the result of the hook.
+    """
+    __slots__ = ('_converter', '_table', 'dispatch')
+
+    def __init__(self, converter):
+        self._converter = converter
+        self._table = DispatchTable(self._make_encoder)
+        self.dispatch = self._table.dispatch
+
+    def clear(self):
+        """Drop the cached encoding functions, after hooks change."""
+        self._table.clear()
+
+    def encode(self, obj):
+        # type: (Any) -> str
+        return self.dispatch(obj.__class__)(obj)
+
+    def _make_encoder(self, cl):
+        converter = self._converter
+        handler = converter._unstructure_func.dispatch(cl)
+        if handler == converter.unstructure_attrs_asdict:
+            return make_json_encode_fn(cl, converter, self)
+        if handler == converter.unstructure_attrs_astuple:
+            return make_json_encode_fn(cl, converter, self, as_tuple=True)
+        if handler == converter._unstructure_seq:
+            return self._encode_seq
+        if handler == converter._unstructure_mapping:
+            return self._encode_mapping
+        if handler == converter._unstructure_identity:
+            if cl is NoneType:
+                return _null_str
+            if issubclass(cl, string_types):
+                return encode_basestring_ascii
+            if issubclass(cl, bool):
+                return _bool_str
+            if issubclass(cl, int_types):
+                return _int_str
+            if issubclass(cl, float):
+                return _float_str
+            return _not_serializable
+
+        def encode_hook_result(o):
+            res = handler(o)
+            return self.dispatch(res.__class__)(res)
+        return encode_hook_result
+
+    def _encode_seq(self, seq):
+        encode_for = self.dispatch
+        return '[' + ','.join([encode_for(e.__class__)(e)
+                               for e in seq]) + ']'
+
+    def _encode_mapping(self, mapping):
+        encode_for = self.dispatch
+        unstructure_for = self._converter._unstructure_func.dispatch
+        return '{' + ','.join([
+            _key_str(unstructure_for(k.__class__)(k)) + ':' +
+            encode_for(v.__class__)(v)
+            for k, v in mapping.items()
+        ]) + '}'
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_raw_decode = json.JSONDecoder().raw_decode
+
+
+def _iter_text_chunks(source, chunk_size):
+    """Iterate over a file object or an iterable of chunks as text.
+
+    Bytes are decoded as UTF-8, incrementally.
+    """
+    if hasattr(source, 'read'):
+        read = source.read
+        source = iter(lambda: read(chunk_size), read(0))
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in source:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        yield chunk
+    # Raises on a truncated character.
+    yield decoder.decode(b'', final=True)
+
+
+class _TextBuffer(object):
+    """A window over a stream of text chunks."""
+    __slots__ = ('_chunks', 'text', 'pos', 'eof')
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size):
+        """Read chunks until at least `size` characters are unconsumed, or
+        the stream ends. Consumed text is dropped.
+        """
+        parts = [self.text[self.pos:]]
+        n = len(parts[0])
+        while n < size:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self.eof = True
+                break
+            parts.append(chunk)
+            n += len(chunk)
+        self.text = ''.join(parts)
+        self.pos = 0
+
+    def peek(self):
+        """Skip whitespace and return the next character, or an empty
+        string at the end of the stream.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if self.eof:
+                return ''
+            self.fill(1)
+
+    def decode(self):
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _raw_decode(self.text, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # A value ending exactly at the end of the buffer may be a
+                # number continuing in the next chunk.
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return obj
+            # Grow the window geometrically, so large values are only
+            # decoded a logarithmic number of times.
+            self.fill(2 * (len(self.text) - self.pos) + 1)
+
+
+def iter_json_array(source, chunk_size=65536):
+    # type: (Any, int) -> Iterator[Any]
+    """Incrementally decode a JSON array, yielding its elements.
+
+    `source` is a file object, read `chunk_size` at a time, or an iterable
+    of chunks. Chunks may be bytes, decoded as UTF-8, or text. Only the
+    current element and the unconsumed part of the current chunk are held
+    in memory.
+    """
+    buf = _TextBuffer(_iter_text_chunks(source, chunk_size))
+    if buf.peek() != '[':
+        raise ValueError('Expecting a JSON array.')
+    buf.pos += 1
+    if buf.peek() == ']':
+        buf.pos += 1
+    else:
+        while True:
+            yield buf.decode()
+            char = buf.peek()
+            buf.pos += 1
+            if char == ']':
+                break
+            if char != ',':
+                raise ValueError("Expecting ',' or ']' in a JSON array.")
+    if buf.peek():
+        raise ValueError('Extra data after a JSON array.')
@@ -0,0 +1,230 @@
+"""Lazily structured instances of attrs classes, and lazily unstructured
+views of them."""
+from typing import Mapping
+
+from attr import Factory, NOTHING
+
+from .gen import (_compile_fn, _structure_field_expr,
+                  _trusted_instance_check)
+
+
+def _is_lazy_field(a, converter):
+    """Is structuring the attribute worth deferring?
+
+    Attributes needing more than a call to their type (attrs classes,
+    collections, unions and types with custom hooks) are deferred.
+    """
+    if a.type is None:
+        return False
+    handler = converter._structure_func.dispatch(a.type)
+    return handler not in (converter._structure_call,
+                           converter._structure_trusted,
+                           converter._structure_unicode,
+                           converter._structure_interned,
+                           converter._structure_default)
+
+
+def _storage(cl, name):
+    """Return functions getting and setting the value of an attribute,
+    bypassing the lazy class properties and frozen ``__setattr__`` s.
+
+    Getting an unset value raises ``AttributeError``.
+    """
+    desc = getattr(cl, name, None)
+    if hasattr(desc, '__set__'):
+        # A slot member descriptor.
+        def getter(inst):
+            return desc.__get__(inst, cl)
+        return getter, desc.__set__
+
+    def getter(inst):
+        try:
+            return inst.__dict__[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def setter(inst, val):
+        inst.__dict__[name] = val
+    return getter, setter
+
+
+def _lazy_property(name, getter, setter, structure, type_):
+    def fget(self):
+        try:
+            return getter(self)
+        except AttributeError:
+            pass
+        pending = self._cattrs_pending
+        try:
+            raw = pending[name]
+        except KeyError:
+            # Structured by another thread meanwhile.
+            return getter(self)
+        val = structure(raw, type_)
+        setter(self, val)
+        pending.pop(name, None)
+        return val
+
+    def fset(self, val):
+        # Only reached for non-frozen classes.
+        self._cattrs_pending.pop(name, None)
+        setter(self, val)
+    return property(fget, fset)
+
+
+def make_lazy_class(cl, converter, lazy_attrs):
+    # type: (Type, Converter, Sequence[Attribute]) -> Type
+    """Create a subclass of `cl` structuring the given attributes on first
+    access.
+
+    Raw values of the attributes are kept in the ``_cattrs_pending`` dict
+    until then. The subclass reports `cl` as its ``__class__``, and pickles
+    as an instance of `cl`.
+    """
+    ns = {
+        '__slots__': ('_cattrs_pending',),
+        '__module__': cl.__module__,
+        '__class__': property(lambda self: cl),
+        '__reduce__': lambda self: (cl, tuple(
+            getattr(self, a.name) for a in cl.__attrs_attrs__ if a.init)),
+    }
+    for a in lazy_attrs:
+        getter, setter = _storage(cl, a.name)
+        if (getattr(a.type, '__attrs_attrs__', None) is not None and
+                converter._structure_func.dispatch(a.type) ==
+                converter._structure_attrs):
+            # Nested instances are lazy too.
+            structure = converter.structure_lazy
+        else:
+            structure = converter._structure_func.dispatch(a.type)
+        ns[a.name] = _lazy_property(
+            a.name, getter, setter, structure, a.type)
+    sub = type(cl.__name__, (cl,), ns)
+    if hasattr(cl, '__qualname__'):
+        sub.__qualname__ = cl.__qualname__
+    return sub
+
+
+def make_lazy_structure_fn(cl, converter, as_tuple=False):
+    # type: (Type, Converter, bool) -> Callable[[Any, Type], Any]
+    """Generate a function structuring mappings (or sequences, if
+    `as_tuple` is true) into lazy instances of `cl`.
+
+    Attributes worth deferring are stored raw, and structured on first
+    access; the others are structured right away. Validators are not run.
+    """
+    attrs = cl.__attrs_attrs__
+    lazy_attrs = [a for a in attrs if a.init and _is_lazy_field(a, converter)]
+    lazy_names = set(a.name for a in lazy_attrs)
+    sub = make_lazy_class(cl, converter, lazy_attrs)
+    globs = {
+        '__cl': cl,
+        '__sub': sub,
+        '__new': object.__new__,
+        '__setattr': object.__setattr__,
+    }
+    func_name = 'structure_lazy'
+    lines = ['def {0}(o, _):'.format(func_name)]
+    _trusted_instance_check(converter, lines)
+    lines.extend(['    inst = __new(__sub)',
+                  '    pending = {}',
+                  "    __setattr(inst, '_cattrs_pending', pending)"])
+    for i, a in enumerate(attrs):
+        name = a.name
+        if a.name in lazy_names:
+            set_name = '__set{0}'.format(i)
+            globs[set_name] = _storage(cl, name)[1]
+            set_fmt = set_name + '(inst, {0})'
+        else:
+            set_fmt = '__setattr(inst, {0!r}, {{0}})'.format(name)
+
+        # The default, if any.
+        if a.default is NOTHING:
+            default = None
+        elif isinstance(a.default, Factory):
+            globs['__df{0}'.format(i)] = a.default.factory
+            default = set_fmt.format(
+                '__df{0}({1})'.format(
+                    i, 'inst' if getattr(a.default, 'takes_self', False)
+                    else ''))
+        else:
+            globs['__d{0}'.format(i)] = a.default
+            default = set_fmt.format('__d{0}'.format(i))
+
+        if not a.init:
+            if default is not None:
+                lines.append('    ' + default)
+            continue
+
+        if as_tuple:
+            raw = 'o[{0}]'.format(i)
+            present = 'len(o) > {0}'.format(i)
+        else:
+            raw = 'o[{0!r}]'.format(name)
+            present = '{0!r} in o'.format(name)
+        if a.name in lazy_names:
+            stmts = ['pending[{0!r}] = {1}'.format(name, raw)]
+        else:
+            binding, expr = _structure_field_expr(a, i, raw, converter,
+                                                  globs)
+            stmts = [binding] if binding is not None else []
+            stmts.append(set_fmt.format(expr))
+        if default is None:
+            lines.extend('    ' + stmt for stmt in stmts)
+        else:
+            lines.append('    if {0}:'.format(present))
+            lines.extend('        ' + stmt for stmt in stmts)
+            lines.append('    else:')
+            lines.append('        ' + default)
+    if hasattr(cl, '__attrs_post_init__'):
+        lines.append('    inst.__attrs_post_init__()')
+    lines.append('    return inst')
+    return _compile_fn(cl, func_name, lines, globs)
+
+
+class UnstructureView(Mapping):
+    """A read-only mapping over an ``attrs`` instance, unstructuring each
+    attribute on first access.
+
+    Keys are the attribute names, in definition order. Values are
+    unstructured through the converter's hooks, and cached.
+    """
+    __slots__ = ('_obj', '_converter', '_names', '_cache')
+
+    def __init__(self, obj, converter):
+        self._obj = obj
+        self._converter = converter
+        self._names = [a.name for a in obj.__class__.__attrs_attrs__]
+        self._cache = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        if key not in self._names:
+            raise KeyError(key)
+        val = getattr(self._obj, key)
+        val = self._cache[key] = self._converter._unstructure_func.dispatch(
+            val.__class__)(val)
+        return val
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, key):
+        return key in self._names
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, self._obj)
+
+    def materialize(self):
+        # type: () -> Mapping
+        """Unstructure the remaining attributes, and return all of them in a
+        mapping created with the converter's dict factory.
+        """
+        return self._converter._dict_factory(
+            (name, self[name]) for name in self._names)
@@ -0,0 +1,236 @@
+"""Memoization of unstructured frozen attrs instances, and interning of
+structured values."""
+from collections import OrderedDict
+from enum import Enum
+from threading import Lock
+
+from typing import Union
+from attr._make import _frozen_setattrs
+
+from ._compat import bytes, get_origin, int_types, unicode
+from .dispatch_table import DispatchTable
+
+_IMMUTABLE_CLASSES = frozenset(
+    (type(None), bool, float, unicode, bytes) + int_types)
+
+
+def is_frozen(cl):
+    # type: (Type) -> bool
+    """Is `cl` a frozen ``attrs`` class?"""
+    setattr_ = getattr(cl, '__setattr__', None)
+    # Unbound methods wrap the function on Python 2.
+    return getattr(setattr_, '__func__', setattr_) is _frozen_setattrs
+
+
+def _unstructures_immutably(type_, converter, seen):
+    """Is the unstructured form of values of `type_` immutable?"""
+    if type_ in seen:
+        # A recursive class, being checked.
+        return True
+    dispatch = converter._unstructure_func.dispatch
+    origin = get_origin(type_)
+    if origin is Union:
+        return all(_unstructures_immutably(t, converter, seen)
+                   for t in type_.__args__)
+    if origin in (tuple, frozenset):
+        args = [t for t in getattr(type_, '__args__', None) or ()
+                if t is not Ellipsis]
+        # Frozensets aren't sequences, and are passed through.
+        return (bool(args) and
+                dispatch(origin) in (converter._unstructure_seq,
+                                     converter._unstructure_identity) and
+                all(_unstructures_immutably(t, converter, seen)
+                    for t in args))
+    if origin is not None or not isinstance(type_, type):
+        # Untyped, Any, or mutable generics.
+        return False
+    handler = dispatch(type_)
+    if type_ in _IMMUTABLE_CLASSES:
+        return handler == converter._unstructure_identity
+    if issubclass(type_, Enum):
+        return handler == converter._unstructure_enum
+    if (getattr(type_, '__attrs_attrs__', None) is not None and
+            handler == converter.unstructure_attrs_astuple):
+        return is_memoizable(type_, converter, seen)
+    # Attrs classes unstructured into dicts, or types with custom hooks.
+    return False
+
+
+def is_memoizable(cl, converter, seen=frozenset()):
+    # type: (Type, Converter, FrozenSet[Type]) -> bool
+    """Can the unstructured forms of instances of `cl` be memoized?
+
+    The class must be frozen, and its fields typed so that their
+    unstructured forms are immutable: primitives, enums, tuples and
+    frozensets of those, and frozen attrs classes like this unstructured
+    into tuples, all using the default hooks. Otherwise, results could
+    change, or share mutable values.
+    """
+    if not is_frozen(cl):
+        return False
+    seen = seen | {cl}
+    return all(_unstructures_immutably(a.type, converter, seen)
+               for a in cl.__attrs_attrs__)
+
+
+class UnstructureMemo(object):
+    """
+    UnstructureMemo caches the unstructured forms of instances, keyed by
+    identity.
+
+    Only instances of classes passing ``is_memoizable`` should be memoized.
+    Entries keep a reference to their instance, so its ``id`` can't be
+    reused while cached. The least recently used entry is evicted once
+    ``maxsize`` instances are cached. A ``maxsize`` of ``None`` or less
+    than 1 disables memoization. The table is updated under a lock, so
+    memoized functions can be shared by threads.
+    """
+    __slots__ = ('maxsize', '_table', '_lock')
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._table = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def enabled(self):
+        return self.maxsize is not None and self.maxsize > 0
+
+    def clear(self):
+        """Drop all cached results, after hooks change."""
+        with self._lock:
+            self._table.clear()
+
+    def __len__(self):
+        return len(self._table)
+
+    def wrap(self, fn, copy=None):
+        # type: (Callable[[Any], Any], Optional[Callable]) -> Callable
+        """Memoize an unstructuring function.
+
+        Cached results are passed through `copy`, if given, before being
+        returned. If memoization is disabled, `fn` is returned as is.
+        """
+        if not self.enabled:
+            return fn
+        table = self._table
+        lock = self._lock
+        maxsize = self.maxsize
+
+        def memoized(obj):
+            key = id(obj)
+            with lock:
+                entry = table.pop(key, None)
+                if entry is not None:
+                    # Re-inserted as the most recently used entry.
+                    table[key] = entry
+            if entry is None:
+                # Nested instances are memoized too, so the lock can't be
+                # held here.
+                entry = (obj, fn(obj))
+                with lock:
+                    while len(table) >= maxsize:
+                        table.popitem(last=False)
+                    table[key] = entry
+            return entry[1] if copy is None else copy(entry[1])
+        return memoized
+
+
+def _interns_safely(type_, seen):
+    """Are equal values of `type_` interchangeable, given their classes?"""
+    if type_ in seen:
+        return True
+    origin = get_origin(type_)
+    if origin is Union:
+        return all(_interns_safely(t, seen) for t in type_.__args__)
+    if origin is not None or not isinstance(type_, type):
+        # Untyped, Any, or collections, which may hold equal values of
+        # different classes.
+        return False
+    if type_ in _IMMUTABLE_CLASSES or issubclass(type_, Enum):
+        return True
+    if getattr(type_, '__attrs_attrs__', None) is not None:
+        return is_internable(type_, seen)
+    return False
+
+
+def is_internable(cl, seen=frozenset()):
+    # type: (Type, FrozenSet[Type]) -> bool
+    """Can instances of `cl` be interned?
+
+    The class must be frozen, and its fields typed as primitives, enums,
+    unions of those, or attrs classes like this. Interned instances are
+    compared by the classes of their fields too, so these can't hide equal
+    values of different classes, like ``1`` and ``1.0`` in a tuple.
+    """
+    if not is_frozen(cl):
+        return False
+    seen = seen | {cl}
+    return all(_interns_safely(a.type, seen) for a in cl.__attrs_attrs__)
+
+
+def _field_classes(val):
+    """Return the class of a value and, for attrs instances, the classes of
+    their fields, recursively."""
+    cl = val.__class__
+    attrs = getattr(cl, '__attrs_attrs__', None)
+    if attrs is None:
+        return cl
+    return (cl,) + tuple([_field_classes(getattr(val, a.name))
+                          for a in attrs])
+
+
+class Interner(object):
+    """
+    Interner deduplicates equal values, so structured data shares them.
+
+    Values are kept in a table per type, so equal values of different types
+    (``1`` and ``True``, or ``'a'`` and ``u'a'`` on Python 2) aren't mixed
+    up. Instances of attrs classes are also told apart by the classes of
+    their fields, so ``C(1)`` and ``C(True)`` aren't mixed up either; only
+    classes passing ``is_internable`` should be interned. Each table holds up
+    to ``maxsize`` values, and drops the oldest one when full; tables are
+    updated under a lock, so they can be shared by threads. Unhashable
+    values are passed through.
+    """
+    __slots__ = ('maxsize', '_table', 'dispatch')
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._table = DispatchTable(self._make_intern_fn)
+        # Return the interning function for a type.
+        self.dispatch = self._table.dispatch
+
+    def clear(self):
+        """Drop all interned values."""
+        self._table.clear()
+
+    def _make_intern_fn(self, cl):
+        table = OrderedDict()
+        lock = Lock()
+        maxsize = self.maxsize
+        is_attrs = getattr(cl, '__attrs_attrs__', None) is not None
+
+        def intern(val):
+            key = (_field_classes(val), val) if is_attrs else val
+            with lock:
+                try:
+                    return table[key]
+                except KeyError:
+                    if len(table) >= maxsize:
+                        table.popitem(last=False)
+                    table[key] = val
+                    return val
+                except TypeError:
+                    # Unhashable.
+                    return val
+        return intern
+
+    def wrap(self, fn, cl):
+        # type: (Callable[[Any, Type], Any], Type) -> Callable
+        """Intern the instances of `cl` a structure hook returns."""
+        intern = self.dispatch(cl)
+
+        def interned(obj, cl):
+            return intern(fn(obj, cl))
+        return interned
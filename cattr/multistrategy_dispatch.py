@@ -1,6 +1,7 @@
 import attr
+from .dispatch_table import DispatchTable, EvictionPolicy
 from .function_dispatch import FunctionDispatch
-from ._compat import singledispatch, lru_cache
+from ._compat import singledispatch
 
 
 @attr.s
@@ -17,14 +18,21 @@ class MultiStrategyDispatch(object):
     singledispatch is attempted first. If nothing is
     registered for singledispatch, or an exception occurs,
     the FunctionDispatch instance is then used.
+
+    The keyword arguments configure the tables caching dispatch results.
     """
-    __slots__ = ('_function_dispatch', '_single_dispatch', 'dispatch')
+    __slots__ = ('_function_dispatch', '_single_dispatch', '_cache',
+                 'dispatch')
 
-    def __init__(self, fallback_func):
-        self._function_dispatch = FunctionDispatch()
+    def __init__(self, fallback_func, maxsize=None, policy=EvictionPolicy.LRU,
+                 stats=False):
+        self._function_dispatch = FunctionDispatch(
+            maxsize=maxsize, policy=policy, stats=stats)
         self._function_dispatch.register(lambda cls: True, fallback_func)
         self._single_dispatch = singledispatch(_DispatchNotFound)
-        self.dispatch = lru_cache(64)(self._dispatch)
+        self._cache = DispatchTable(self._dispatch, maxsize=maxsize,
+                                    policy=policy, stats=stats)
+        self.dispatch = self._cache.dispatch
 
     def _dispatch(self, cl):
         try:
@@ -39,12 +47,44 @@ class MultiStrategyDispatch(object):
         """ register a class to singledispatch """
         for cls, handler in cls_and_handler:
             self._single_dispatch.register(cls, handler)
-        self.dispatch.cache_clear()
+        self.clear_cache()
 
     def register_func_list(self, func_and_handler):
         """ register a function to determine if the handle
             should be used for the type
+
+            entries are either (func, handler), (func, handler, key) or
+            (func, handler, key, is_factory), where key is an index key for
+            FunctionDispatch and factories create handlers for types.
+        """
+        for entry in func_and_handler:
+            self._function_dispatch.register(*entry)
+        self.clear_cache()
+
+    def register_func_factory_list(self, func_and_factory):
+        """ register factories creating the handlers of the types a
+            function matches
+
+            entries are either (func, factory) or (func, factory, key).
+            Factories are called with the type, and the handlers they
+            return are cached per type.
         """
-        for func, handler in func_and_handler:
-            self._function_dispatch.register(func, handler)
-        self.dispatch.cache_clear()
+        for entry in func_and_factory:
+            func, factory = entry[:2]
+            key = entry[2] if len(entry) > 2 else None
+            self._function_dispatch.register(func, factory, key, True)
+        self.clear_cache()
+
+    def clear_cache(self):
+        """Drop the cached handlers.
+
+        Handlers made by factories may depend on other handlers, so all of
+        them are dropped whenever a handler is registered.
+        """
+        self._function_dispatch.clear_cache()
+        self._cache.clear()
+
+    def cache_info(self):
+        # type: () -> CacheInfo
+        """Report the statistics of the dispatch cache."""
+        return self._cache.cache_info()
@@ -0,0 +1,88 @@
+"""Structuring in worker processes."""
+import pickle
+from itertools import islice
+
+from .dispatch_table import DispatchTable
+
+
+def _spec_key(spec):
+    """Return a hashable key identifying the spec, or ``None``.
+
+    Specs with unhashable hooks or arguments are keyed by their pickled
+    form. Specs which can't be pickled either, when using threads, can't be
+    keyed.
+    """
+    try:
+        hash(spec)
+    except TypeError:
+        pass
+    else:
+        return spec
+    try:
+        return pickle.dumps(spec, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # Pickling errors vary by Python version and object.
+        return None
+
+
+def _build_converter(key):
+    """Build the converter for a spec key."""
+    spec = pickle.loads(key) if isinstance(key, bytes) else key
+    return spec.build()
+
+
+# Converters rebuilt in this (worker) process, by spec key. Only the most
+# recently used are kept; with thread pools, this is the main process.
+_worker_converters = DispatchTable(_build_converter, maxsize=8)
+
+
+def _structure_chunk(key, spec, objs, cl, pause_gc):
+    """Structure a chunk of objects using the converter for a spec key.
+
+    This runs in the workers. Specs which can't be keyed are given as is,
+    and their converter is rebuilt for every chunk.
+    """
+    if key is None:
+        converter = spec.build()
+    else:
+        converter = _worker_converters.dispatch(key)
+    return converter.structure_many(objs, cl, pause_gc=pause_gc)
+
+
+def _chunks(objs, size):
+    it = iter(objs)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def structure_parallel(spec, objs, cl, executor, chunksize, pause_gc=False):
+    """Structure objects using an executor, returning the results in order.
+
+    `executor` is either an executor instance, or an executor class, in
+    which case an instance is created and shut down when done. The objects
+    are submitted in chunks of `chunksize`; each worker rebuilds the
+    converter from `spec` once, and keeps the most recently used ones.
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1.')
+    key = _spec_key(spec)
+    # Keyed specs are sent as their key only.
+    if key is not None:
+        spec = None
+    owns_executor = isinstance(executor, type)
+    if owns_executor:
+        executor = executor()
+    try:
+        futures = [executor.submit(_structure_chunk, key, spec, chunk, cl,
+                                   pause_gc)
+                   for chunk in _chunks(objs, chunksize)]
+        res = []
+        for future in futures:
+            res.extend(future.result())
+        return res
+    finally:
+        if owns_executor:
+            executor.shutdown()
@@ -0,0 +1,50 @@
+"""Picklable descriptions of converters."""
+import attr
+
+
+@attr.s(frozen=True)
+class _ConverterMethod(object):
+    """Stands in for a method bound to the converter being described."""
+    name = attr.ib()
+
+
+@attr.s(frozen=True)
+class ConverterSpec(object):
+    """
+    A picklable description of a converter: its class, the arguments it was
+    created with and the hooks registered on it, in order.
+
+    Building the spec creates an equivalent converter. The spec is only
+    picklable if the registered hooks are, for example module-level
+    functions.
+    """
+    converter_class = attr.ib()
+    init_kwargs = attr.ib()  # A tuple of (name, value) pairs.
+    registrations = attr.ib()  # A tuple of (method name, args) pairs.
+
+    @classmethod
+    def from_log(cls, converter, init_kwargs, registrations):
+        """Describe a converter, given its init arguments and registrations.
+
+        Methods bound to the converter itself are recorded by name.
+        """
+        def encode(arg):
+            if getattr(arg, '__self__', None) is converter:
+                return _ConverterMethod(arg.__name__)
+            return arg
+        return cls(
+            converter.__class__,
+            tuple(sorted(init_kwargs.items())),
+            tuple((method, tuple(encode(arg) for arg in args))
+                  for method, args in registrations),
+        )
+
+    def build(self):
+        """Create a new converter matching this description."""
+        converter = self.converter_class(**dict(self.init_kwargs))
+        for method, args in self.registrations:
+            args = [getattr(converter, arg.name)
+                    if isinstance(arg, _ConverterMethod) else arg
+                    for arg in args]
+            getattr(converter, method)(*args)
+        return converter
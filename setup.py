@@ -12,7 +12,6 @@ with open('HISTORY.rst') as history_file:
 
 requirements = [
     "attrs >= 17.3",
-    "functools32 >= 3.2.3; python_version<'3.0'",
     "singledispatch >= 3.4.0.3; python_version<'3.0'",
     "enum34 >= 1.1.6; python_version<'3.0'",
     "typing >= 3.5.3; python_version<'3.0'",
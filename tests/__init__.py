@@ -1,6 +1,9 @@
 import string
 import keyword
 import os
+import sys
+
+from threading import Thread
 
 from collections import OrderedDict
 from enum import Enum
@@ -268,3 +271,36 @@ def simple_classes(defaults=None):
 # and returns another strategy (building on top of the base strategy).
 nested_classes = st.recursive(simple_classes(defaults=True),
                               _create_hyp_nested_strategy)
+
+
+def run_in_threads(work, count=8):
+    """
+    Call `work` with the indices of `count` threads, switching between the
+    threads often to make races likely. Return the exceptions raised.
+    """
+    errors = []
+
+    def run(i):
+        try:
+            work(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [Thread(target=run, args=(i,)) for i in range(count)]
+    if hasattr(sys, 'setswitchinterval'):
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+    else:
+        interval = sys.getcheckinterval()
+        sys.setcheckinterval(1)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if hasattr(sys, 'setswitchinterval'):
+            sys.setswitchinterval(interval)
+        else:
+            sys.setcheckinterval(interval)
+    return errors
@@ -51,6 +51,20 @@ def test_nested_roundtrip(cls_and_vals, strat):
     assert inst == converter.structure(converter.unstructure(inst), cl)
 
 
+@given(nested_typed_classes, unstructure_strats)
+def test_nested_roundtrip_lazy(cls_and_vals, strat):
+    """
+    Nested classes with metadata can be structured lazily.
+    """
+    converter = Converter(unstruct_strat=strat)
+    cl, vals = cls_and_vals
+    inst = cl(*vals)
+    lazy = converter.structure_lazy(converter.unstructure(inst), cl)
+    assert lazy.__class__ is cl
+    assert lazy == inst
+    assert repr(lazy).startswith(cl.__name__ + '(')
+
+
 @given(simple_typed_classes(defaults=False),
        simple_typed_classes(defaults=False),
        unstructure_strats)
@@ -0,0 +1,60 @@
+"""Tests for the compact binary format."""
+import json
+from enum import Enum
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import attr
+import pytest
+from hypothesis import given
+
+from cattr._compat import bytes, unicode
+
+from .metadata import nested_typed_classes
+
+
+@given(nested_typed_classes)
+def test_binary_roundtrip(converter, cl_and_vals):
+    """Classes with type metadata survive a roundtrip."""
+    cl, vals = cl_and_vals
+    inst = cl(*vals)
+    dumped = converter.dumps_binary(inst)
+
+    assert isinstance(dumped, bytes)
+    loaded = converter.loads_binary(dumped, cl)
+    # NaNs don't compare equal, compare the JSON with NaNs as strings.
+    assert (json.loads(converter.dumps(loaded), parse_constant=str) ==
+            json.loads(converter.dumps(inst), parse_constant=str))
+
+
+def test_binary_types(converter):
+    """Enums, optionals, collections and untyped fields are supported."""
+    class E(Enum):
+        A = 'a'
+        B = 'b'
+
+    @attr.s
+    class C(object):
+        i = attr.ib(type=int)
+        b = attr.ib(type=bool)
+        by = attr.ib(type=bytes)
+        e = attr.ib(type=E)
+        t = attr.ib(type=Tuple[int, unicode])
+        fs = attr.ib(type=FrozenSet[int])
+        d = attr.ib(type=Dict[unicode, List[float]])
+        o = attr.ib(type=Optional[E], default=None)
+        untyped = attr.ib(default=None)
+
+    inst = C(-2 ** 70, True, b'\x00\xff', E.B, (1, u'\xe9'), frozenset([3]),
+             {u'a': [1.5]}, E.A, [None, {u'k': [1, b'']}, 2.5])
+    dumped = converter.dumps_binary(inst)
+    assert converter.loads_binary(dumped, C) == inst
+    assert converter.dumps_binary(-1, int) == b'\x01'
+    assert converter.dumps_binary(300, int) == b'\xd8\x04'
+
+    with pytest.raises(ValueError):
+        converter.loads_binary(dumped + b'\x00', C)
+    with pytest.raises(ValueError):
+        converter.dumps_binary(object())
+    with pytest.raises(ValueError):
+        converter.dumps_binary(C(1, True, b'', E.A, (1, u''), frozenset(), {},
+                                 untyped=object()))
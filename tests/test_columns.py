@@ -0,0 +1,134 @@
+"""Tests for columnar (un)structuring."""
+import os
+import subprocess
+import sys
+from array import array
+from enum import Enum
+
+import attr
+import pytest
+
+from typing import List, Optional
+
+import cattr
+from cattr._compat import unicode
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class E(Enum):
+    A = 'a'
+    B = 'b'
+
+
+@attr.s
+class Inner(object):
+    a = attr.ib(type=int)
+
+
+@attr.s
+class C(object):
+    i = attr.ib(type=int)
+    f = attr.ib(type=float)
+    s = attr.ib(type=unicode)
+    e = attr.ib(type=E)
+    inner = attr.ib(type=Optional[Inner])
+    untyped = attr.ib()
+    ls = attr.ib(type=List[int])
+
+
+def _insts():
+    return [C(1, 1.5, u'a', E.A, Inner(1), (1, 2), [1]),
+            C(2, 2, u'b', E.B, None, 'x', [])]
+
+
+def test_unstructure_columns_arrays(converter):
+    """Int and float columns are arrays, other columns lists."""
+    cols = converter.unstructure_columns(_insts(), C, use_numpy=False)
+
+    assert set(cols) == {a.name for a in attr.fields(C)}
+    assert isinstance(cols['i'], array)
+    assert list(cols['i']) == [1, 2]
+    assert isinstance(cols['f'], array)
+    assert list(cols['f']) == [1.5, 2.0]
+    assert cols['s'] == [u'a', u'b']
+    assert cols['e'] == ['a', 'b']
+    assert cols['inner'] == [{'a': 1}, None]
+    assert cols['untyped'] == [(1, 2), 'x']
+    assert cols['ls'] == [[1], []]
+
+
+def test_unstructure_columns_fallback(converter):
+    """Columns with values not fitting an array are lists."""
+    insts = _insts()
+    insts[0].i = None
+    insts[1].f = 'nope'
+    cols = converter.unstructure_columns(iter(insts), C, use_numpy=False)
+
+    assert cols['i'] == [None, 2]
+    assert cols['f'] == [1.5, 'nope']
+
+    insts[0].i = 2 ** 70
+    assert converter.unstructure_columns(insts, C)['i'] == [2 ** 70, 2]
+
+
+def test_unstructure_columns_hooks(converter):
+    """Hooks registered for primitives are honored."""
+    converter.register_unstructure_hook(int, lambda i: i * 2)
+    cols = converter.unstructure_columns(_insts(), C)
+
+    assert cols['i'] == [2, 4]
+    assert cols['inner'] == [{'a': 2}, None]
+
+
+@pytest.mark.skipif(numpy is None, reason='NumPy is not installed.')
+def test_unstructure_columns_numpy(converter):
+    """NumPy arrays are used if available."""
+    cols = converter.unstructure_columns(_insts(), C)
+
+    assert cols['i'].dtype == numpy.int64
+    assert cols['i'].tolist() == [1, 2]
+    assert cols['f'].dtype == numpy.float64
+    assert cols['f'].tolist() == [1.5, 2.0]
+
+
+def test_numpy_imported_lazily():
+    """Importing cattrs doesn't import NumPy."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [os.path.dirname(os.path.dirname(cattr.__file__))] + sys.path))
+    out = subprocess.check_output(
+        [sys.executable, '-c',
+         'import sys, cattr; print("numpy" in sys.modules)'], env=env)
+    assert out.strip() == b'False'
+
+
+def test_structure_columns_roundtrip(converter):
+    """Unstructured columns can be structured back."""
+    insts = _insts()
+    for use_numpy in (True, False):
+        cols = converter.unstructure_columns(insts, C, use_numpy=use_numpy)
+        assert converter.structure_columns(cols, C) == insts
+
+
+def test_structure_columns_coercion(converter):
+    """Primitive columns are converted, missing defaults are skipped."""
+    @attr.s
+    class D(object):
+        a = attr.ib(type=int, default=0)
+        _b = attr.ib(type=float, default=0.0)
+        c = attr.ib(type=List[int], default=attr.Factory(list))
+
+    cols = {'_b': ['1.5', 2], 'c': [['1'], []], 'x': [1]}
+    assert converter.structure_columns(cols, D) == [D(0, 1.5, [1]),
+                                                    D(0, 2.0, [])]
+    assert converter.structure_columns({'a': array('d', [1, 2])}, D) == [
+        D(1), D(2)]
+    assert converter.structure_columns({}, D) == []
+
+    with pytest.raises(ValueError):
+        converter.structure_columns({'a': [1], '_b': [1, 2]}, D)
+    with pytest.raises(KeyError):
+        converter.structure_columns({'i': [1]}, C)
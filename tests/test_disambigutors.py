@@ -1,15 +1,21 @@
 """Tests for auto-disambiguators."""
+from typing import List, Optional, Union
+
 import attr
 import pytest
 
 from hypothesis import assume, given
 
-from cattr.disambiguators import create_uniq_field_dis_func
+from cattr import Converter
+from cattr.disambiguators import (create_decision_tree_dis_func,
+                                  create_uniq_field_dis_func)
 
 from . import simple_classes
 
 
-def test_edge_errors():
+@pytest.mark.parametrize('create_dis_func', [create_uniq_field_dis_func,
+                                             create_decision_tree_dis_func])
+def test_edge_errors(create_dis_func):
     """Edge input cases cause errors."""
     @attr.s
     class A(object):
@@ -17,7 +23,7 @@ def test_edge_errors():
 
     with pytest.raises(ValueError):
         # Can't generate for only one class.
-        create_uniq_field_dis_func(A)
+        create_dis_func(A)
 
     @attr.s
     class B(object):
@@ -25,7 +31,7 @@ def test_edge_errors():
 
     with pytest.raises(ValueError):
         # No fields on either class.
-        create_uniq_field_dis_func(A, B)
+        create_dis_func(A, B)
 
     @attr.s
     class C(object):
@@ -37,7 +43,7 @@ def test_edge_errors():
 
     with pytest.raises(ValueError):
         # No unique fields on either class.
-        create_uniq_field_dis_func(C, D)
+        create_dis_func(C, D)
 
 
 @given(simple_classes(defaults=False))
@@ -79,3 +85,104 @@ def test_disambiguation(cl_and_vals_a, cl_and_vals_b):
     fn = create_uniq_field_dis_func(cl_a, cl_b)
 
     assert fn(attr.asdict(cl_a(*vals_a))) is cl_a
+
+
+@given(simple_classes(), simple_classes())
+def test_decision_tree_disambiguation(cl_and_vals_a, cl_and_vals_b):
+    """Decision trees tell classes with different fields apart."""
+    cl_a, vals_a = cl_and_vals_a
+    cl_b, vals_b = cl_and_vals_b
+
+    names_a = {a.name for a in attr.fields(cl_a)}
+    names_b = {a.name for a in attr.fields(cl_b)}
+
+    assume(names_a != names_b)
+
+    fn = create_decision_tree_dis_func(cl_a, cl_b)
+
+    if names_a - names_b:
+        assert fn(attr.asdict(cl_a(*vals_a))) is cl_a
+    if names_b - names_a:
+        assert fn(attr.asdict(cl_b(*vals_b))) is cl_b
+
+
+def test_decision_tree_kinds():
+    """Classes without unique fields are told apart by field kinds and
+    combinations."""
+    @attr.s
+    class A(object):
+        a = attr.ib(type=int)
+        b = attr.ib(type=List[int])
+
+    @attr.s
+    class B(object):
+        a = attr.ib(type=Optional[str])
+        b = attr.ib(type=List[int])
+
+    @attr.s
+    class C(object):
+        a = attr.ib(type=int)
+        c = attr.ib(type=float)
+
+    @attr.s
+    class D(object):
+        b = attr.ib(type=List[int])
+        c = attr.ib(type=float)
+
+    fn = create_decision_tree_dis_func(A, B, C, D)
+
+    assert fn({'a': 1, 'b': []}) is A
+    assert fn({'a': u'1', 'b': []}) is B
+    assert fn({'a': None, 'b': []}) is B
+    assert fn({'a': 1, 'c': 1.0}) is C
+    assert fn({'b': [], 'c': 1}) is D
+    # Values of unexpected kinds fall back to the other tests.
+    assert fn({'a': [], 'c': 1.0}) is C
+    with pytest.raises(ValueError):
+        fn([])
+
+
+def test_decision_tree_presence_first():
+    """Data with only the fields of one class goes to it, whatever the kinds
+    of the values."""
+    @attr.s
+    class A(object):
+        x = attr.ib(type=int)
+        y = attr.ib(type=int)
+
+    @attr.s
+    class B(object):
+        x = attr.ib(type=str)
+        z = attr.ib(type=int)
+
+    fn = create_decision_tree_dis_func(A, B)
+
+    assert fn({'x': u'1', 'y': 2}) is A
+    assert fn({'x': True, 'y': 2}) is A
+    assert fn({'x': 1, 'z': 2}) is B
+    assert Converter().structure({'x': u'1', 'y': 2}, Union[A, B]) == A(1, 2)
+
+
+def test_decision_tree_many_fields():
+    """Trees for classes with many optional fields stay small."""
+    cls = [attr.make_class('C{0}'.format(i), dict(
+        ('f{0}'.format(j), attr.ib(type=int if j % 2 else str, default=0))
+        for j in range(i, i + 30))) for i in range(3)]
+
+    fn = create_decision_tree_dis_func(*cls)
+
+    assert fn({'f0': u'a'}) is cls[0]
+    assert fn({'f31': 1}) is cls[2]
+    assert fn({'f1': 1, 'f30': u'a'}) is cls[1]
+    assert len(fn.__code__.co_code) < 1000
+
+    # Trees too big to build in full test the remaining classes one by one.
+    cls = [attr.make_class('C{0}'.format(i), dict(
+        ('f{0}'.format(j), attr.ib(type=int if j % 3 else str, default=0))
+        for j in range(i, i + 30))) for i in range(24)]
+
+    fn = create_decision_tree_dis_func(*cls)
+
+    for i, cl in enumerate(cls):
+        assert fn(dict(('f{0}'.format(j), 0 if j % 3 else u'a')
+                       for j in range(i, i + 30))) is cl
@@ -0,0 +1,145 @@
+"""Tests for the dispatch tables."""
+from random import Random
+from typing import Dict, List, Optional
+
+import attr
+import pytest
+
+from cattr import Converter, EvictionPolicy
+from cattr._compat import unicode
+from cattr.dispatch_table import DispatchTable
+
+from . import run_in_threads
+
+
+def _resolve(typ):
+    return typ.__name__
+
+
+def test_unbounded_table():
+    """Unbounded tables cache everything until cleared."""
+    table = DispatchTable(_resolve)
+
+    assert table.dispatch(int) == 'int'
+    assert table.dispatch(int) == 'int'
+    assert table.dispatch(str) == 'str'
+
+    info = table.cache_info()
+    assert info.hits is None
+    assert info.misses == 2
+    assert info.maxsize is None
+    assert info.currsize == 2
+    assert info.generation == 0
+
+    dispatch = table.dispatch
+    table.clear()
+    assert table.cache_info().currsize == 0
+    assert table.cache_info().generation == 1
+    # The lookup function stays valid after clearing.
+    assert dispatch(float) == 'float'
+
+
+def test_stats():
+    """Tables created with `stats` count hits."""
+    table = DispatchTable(_resolve, stats=True)
+
+    table.dispatch(int)
+    table.dispatch(int)
+    table.dispatch(int)
+
+    assert table.cache_info()[:2] == (2, 1)
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted."""
+    table = DispatchTable(_resolve, maxsize=2, policy=EvictionPolicy.LRU)
+
+    table.dispatch(int)
+    table.dispatch(str)
+    table.dispatch(int)
+    table.dispatch(float)  # Evicts str.
+
+    assert list(table._table) == [int, float]
+    assert table.cache_info() == (1, 3, 2, 2, 0)
+
+
+def test_fifo_eviction():
+    """The oldest entry is evicted."""
+    table = DispatchTable(_resolve, maxsize=2, policy=EvictionPolicy.FIFO)
+
+    table.dispatch(int)
+    table.dispatch(str)
+    table.dispatch(int)
+    table.dispatch(float)  # Evicts int.
+
+    assert list(table._table) == [str, float]
+
+
+@pytest.mark.parametrize('policy', [EvictionPolicy.LRU, EvictionPolicy.FIFO])
+def test_bounded_table_threads(policy):
+    """Bounded tables can be shared by threads."""
+    table = DispatchTable(_resolve, maxsize=2, policy=policy)
+    converter = Converter(dispatch_cache_size=2)
+    vals = [(1, int), (1.5, float), (u'a', unicode)]
+
+    def work(seed):
+        # Mix hits and evictions.
+        rand = Random(seed)
+        for i in range(50000):
+            val, t = rand.choice(vals)
+            assert table.dispatch(t) == t.__name__
+            if not i % 10:
+                assert converter.structure(val, t) == val
+
+    assert run_in_threads(work) == []
+    assert table.cache_info().currsize == 2
+
+
+def test_converter_cache_info():
+    """Converters expose the statistics of their dispatch tables."""
+    converter = Converter(dispatch_cache_size=10, dispatch_cache_stats=True)
+
+    converter.structure(1, int)
+    converter.structure(1, int)
+    converter.unstructure(1)
+
+    info = converter.dispatch_cache_info()
+    assert info.structure.hits == 1
+    assert info.structure.misses == 1
+    assert info.structure.maxsize == 10
+    assert info.unstructure.misses == 1
+
+    generation = info.structure.generation
+    converter.register_structure_hook(float, lambda v, _: v)
+    info = converter.dispatch_cache_info()
+    assert info.structure.generation == generation + 1
+    assert info.structure.currsize == 0
+
+
+def test_converter_freeze():
+    """Frozen converters resolve reachable hooks up front, and can't be
+    modified."""
+    @attr.s(frozen=True)
+    class Inner(object):
+        a = attr.ib(type=int)
+
+    @attr.s
+    class Outer(object):
+        inner = attr.ib(type=List[Inner])
+        opt = attr.ib(type=Optional[Dict[unicode, Inner]])
+
+    converter = Converter(dispatch_cache_size=10)
+    converter.register_structure_hook(float, lambda v, _: v)
+    frozen = converter.freeze([Outer])
+    assert frozen.frozen and not converter.frozen
+    assert frozen.structure(u'1.5', float) == u'1.5'
+
+    misses = frozen.dispatch_cache_info()
+    outer = Outer([Inner(1)], {u'a': Inner(2)})
+    assert frozen.structure(frozen.unstructure(outer), Outer) == outer
+    assert frozen.dispatch_cache_info() == misses
+
+    with pytest.raises(TypeError):
+        frozen.register_structure_hook(int, lambda v, _: v)
+    converter.register_structure_hook(int, lambda v, _: v)
+    assert frozen.structure(u'1', int) == 1
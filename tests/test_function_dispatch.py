@@ -1,5 +1,9 @@
+import attr
 import pytest
-from cattr.function_dispatch import FunctionDispatch
+
+from typing import List, Union
+
+from cattr.function_dispatch import ATTRS_CLASS, FunctionDispatch
 
 
 def test_function_dispatch():
@@ -37,3 +41,65 @@ def test_function_clears_cache_after_function_added():
         lambda cls: issubclass(cls, Bar), "bar"
     )
     assert dispatch.dispatch(Bar) == "bar"
+
+
+def test_function_dispatch_index_keys():
+    """Indexed functions are only evaluated for types with their key."""
+    dispatch = FunctionDispatch()
+    called = []
+
+    def is_list(cls):
+        called.append(cls)
+        return True
+
+    dispatch.register(is_list, "list", key=list)
+    dispatch.register(lambda cls: True, "attrs", key=ATTRS_CLASS)
+    dispatch.register(lambda cls: issubclass(cls, float), "float")
+
+    assert dispatch.dispatch(List[int]) == "list"
+    assert dispatch.dispatch(list) == "list"
+    assert called == [List[int], list]
+
+    @attr.s
+    class A(object):
+        pass
+
+    assert dispatch.dispatch(A) == "attrs"
+    assert dispatch.dispatch(float) == "float"
+    assert called == [List[int], list]
+
+    with pytest.raises(KeyError):
+        dispatch.dispatch(Union[int, str])
+
+
+def test_function_dispatch_index_order():
+    """The most recently registered function wins, indexed or not."""
+    dispatch = FunctionDispatch()
+
+    dispatch.register(lambda cls: True, "indexed", key=list)
+    dispatch.register(lambda cls: True, "opaque")
+    assert dispatch.dispatch(List[int]) == "opaque"
+
+    dispatch.register(lambda cls: True, "indexed2", key=list)
+    assert dispatch.dispatch(List[int]) == "indexed2"
+    assert dispatch.dispatch(int) == "opaque"
+
+
+def test_function_dispatch_factories():
+    """Factories create handlers per type, cached until cleared."""
+    dispatch = FunctionDispatch()
+    made = []
+
+    def factory(cls):
+        made.append(cls)
+        return cls.__name__
+
+    dispatch.register(lambda cls: issubclass(cls, int), factory, None, True)
+
+    assert dispatch.dispatch(int) == 'int'
+    assert dispatch.dispatch(bool) == 'bool'
+    assert dispatch.dispatch(int) == 'int'
+    assert made == [int, bool]
+    dispatch.clear_cache()
+    assert dispatch.dispatch(int) == 'int'
+    assert made == [int, bool, int]
@@ -0,0 +1,107 @@
+"""Tests for writing and reading JSON directly."""
+import json
+from collections import OrderedDict
+from enum import Enum
+from io import BytesIO
+from typing import Any, List
+
+import attr
+import pytest
+from hypothesis import given
+from hypothesis.strategies import integers, sampled_from
+
+from cattr import Converter, UnstructureStrategy
+
+from .metadata import nested_typed_classes
+
+unstruct_strats = sampled_from([
+    UnstructureStrategy.AS_DICT, UnstructureStrategy.AS_TUPLE])
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def _loads(s):
+    # Keep NaNs as strings, so they compare equal.
+    return json.loads(s, parse_constant=str)
+
+
+@given(nested_typed_classes, unstruct_strats)
+def test_dumps_attrs(cl_and_vals, strat):
+    """Dumping is the same as unstructuring and using the json module."""
+    converter = Converter(dict_factory=OrderedDict, unstruct_strat=strat)
+    cl, vals = cl_and_vals
+    inst = cl(*vals)
+    expected = _loads(_dumps(converter.unstructure(inst)))
+
+    assert _loads(converter.dumps(inst)) == expected
+    assert _loads(converter.dumps([inst, {'a': inst}])) == [
+        expected, {'a': expected}]
+    assert _loads(converter.dumps_bytes(inst).decode('ascii')) == expected
+
+
+def test_dumps_hooks():
+    """Hooks, enums and mixed values are honored."""
+    converter = Converter(dict_factory=OrderedDict)
+
+    class E(Enum):
+        A = 'a'
+
+    @attr.s
+    class Inner(object):
+        a = attr.ib(type=int)
+
+    @attr.s
+    class C(object):
+        i = attr.ib(type=int)
+        f = attr.ib(type=float)
+        inner = attr.ib(type=Inner)
+        e = attr.ib(type=E)
+        d = attr.ib()
+
+    inst = C(True, float('nan'), Inner(1), E.A,
+             {1: [None, 1.5], E.A: (), None: {}})
+    assert converter.dumps(inst) == _dumps(converter.unstructure(inst))
+
+    converter.register_unstructure_hook(Inner, lambda inner: [inner.a])
+    assert converter.dumps(inst) == _dumps(converter.unstructure(inst))
+
+    with pytest.raises(TypeError):
+        converter.dumps(C(1, 1.0, Inner(1), E.A, object()))
+
+
+@given(nested_typed_classes, integers(min_value=1, max_value=16))
+def test_iter_load(cl_and_vals, chunk_size):
+    """Loading incrementally is the same as loading and structuring."""
+    converter = Converter()
+    cl, vals = cl_and_vals
+    insts = [cl(*vals), cl(*vals)]
+    dumped = converter.dumps(insts).encode('ascii')
+    chunks = [dumped[i:i + chunk_size]
+              for i in range(0, len(dumped), chunk_size)]
+
+    res = converter.iter_load(iter(chunks), List[cl])
+    assert not isinstance(res, list)
+    assert _loads(converter.dumps(list(res))) == _loads(dumped.decode())
+    res = converter.iter_load(BytesIO(dumped), List[cl], chunk_size)
+    assert _loads(converter.dumps(list(res))) == _loads(dumped.decode())
+
+
+def test_iter_load_is_lazy(converter):
+    """Elements are yielded as soon as they're complete."""
+    def chunks():
+        yield b' [1, 2'
+        yield b'3 ,"\xc3'
+        yield b'\xa9"]'
+        raise AssertionError('Read past the end of the array.')
+
+    res = converter.iter_load(chunks(), List[Any])
+    assert next(res) == 1
+    assert next(res) == 23
+    assert next(res) == u'\xe9'
+
+    assert list(converter.iter_load([u'[', u']'], List[int])) == []
+    for bad in [b'{}', b'[1 2]', b'[1] 2', b'[1, ']:
+        with pytest.raises(ValueError):
+            list(converter.iter_load([bad], List[int]))
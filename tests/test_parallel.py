@@ -0,0 +1,118 @@
+"""Tests for converter specs and parallel structuring."""
+import pickle
+
+import attr
+import pytest
+
+from typing import List, Union
+
+from cattr import Converter, UnstructureStrategy
+
+
+@attr.s
+class Inner(object):
+    a = attr.ib(type=int)
+
+
+@attr.s
+class Outer(object):
+    inner = attr.ib(type=Inner)
+    b = attr.ib(type=List[float])
+
+
+@attr.s
+class Cat(object):
+    name = attr.ib(type=str)
+
+
+@attr.s
+class Dog(object):
+    name = attr.ib(type=str)
+
+
+def _structure_negative(val, cl):
+    return -int(val)
+
+
+class _Doubler(object):
+    """An unhashable hook."""
+    __hash__ = None
+
+    def __eq__(self, other):
+        return isinstance(other, _Doubler)
+
+    def __call__(self, val, cl):
+        return float(val) * 2
+
+
+def _make_converter():
+    converter = Converter(unstruct_strat=UnstructureStrategy.AS_TUPLE)
+    converter.register_structure_hook(int, _structure_negative)
+    converter.register_structure_hook(Inner,
+                                      converter.structure_attrs_fromdict)
+    return converter
+
+
+def test_spec_roundtrip():
+    """Converters rebuilt from a pickled spec behave the same."""
+    converter = _make_converter()
+    spec = converter.spec()
+    rebuilt = pickle.loads(pickle.dumps(spec)).build()
+
+    data = ({'a': '1'}, ['1.5'])
+    assert rebuilt.unstruct_strat is UnstructureStrategy.AS_TUPLE
+    assert rebuilt.structure(data, Outer) == converter.structure(data, Outer)
+    assert rebuilt.structure(data, Outer) == Outer(Inner(-1), [1.5])
+    assert rebuilt.spec() == spec
+
+
+@pytest.mark.parametrize('as_class', [True, False])
+def test_structure_many_executor(as_class):
+    """Structuring using a process pool returns the results in order."""
+    futures = pytest.importorskip('concurrent.futures')
+    converter = _make_converter()
+    data = [({'a': str(i)}, [str(i)]) for i in range(25)]
+    expected = converter.structure_many(data, Outer)
+
+    if as_class:
+        res = converter.structure_many(
+            data, Outer, executor=futures.ProcessPoolExecutor, chunksize=4)
+    else:
+        with futures.ProcessPoolExecutor(2) as executor:
+            res = converter.structure_many(data, Outer, executor=executor,
+                                           chunksize=4)
+    assert res == expected
+
+
+def test_structure_many_executor_unhashable():
+    """Specs with unhashable hooks can be used with process pools."""
+    futures = pytest.importorskip('concurrent.futures')
+    converter = _make_converter()
+    converter.register_structure_hook(float, _Doubler())
+    data = [({'a': str(i)}, [str(i)]) for i in range(10)]
+
+    with futures.ProcessPoolExecutor(2) as executor:
+        res = converter.structure_many(data, Outer, executor=executor,
+                                       chunksize=4)
+    assert res == converter.structure_many(data, Outer)
+    assert res[1] == Outer(Inner(-1), [2.0])
+
+
+def test_structure_many_executor_tagged_union():
+    """Converters with tagged unions can be used with executors."""
+    futures = pytest.importorskip('concurrent.futures')
+    converter = Converter()
+    converter.register_tagged_union(Union[Cat, Dog], {'cat': Cat, 'dog': Dog})
+    data = [{'type': 'cat' if i % 2 else 'dog', 'name': str(i)}
+            for i in range(10)]
+
+    # Unions can't be pickled, so use threads.
+    with futures.ThreadPoolExecutor(2) as executor:
+        res = converter.structure_many(data, Union[Cat, Dog],
+                                       executor=executor, chunksize=4)
+    assert res == converter.structure_many(data, Union[Cat, Dog])
+    assert res[:2] == [Dog('0'), Cat('1')]
+    # The spec is hashable, so workers can reuse the converter.
+    spec = converter.spec()
+    assert {spec: None}
+    assert spec.build().structure_many(data, Union[Cat, Dog]) == res
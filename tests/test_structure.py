@@ -33,6 +33,14 @@ mut_set_types = sampled_from([Set, MutableSet])
 set_types = one_of(mut_set_types, just(FrozenSet))
 
 
+def _with_args(t, *args):
+    """Create a generic type like `t`, with different arguments.
+
+    Hooks are cached per type, so types mustn't be modified in place.
+    """
+    return (t.__origin__ or t)[args if len(args) > 1 else args[0]]
+
+
 def create_generic_type(generic_types, param_type):
     """Create a strategy for generating parameterized generic types."""
     return one_of(generic_types,
@@ -71,6 +79,36 @@ def test_structuring_seqs(converter, seq_and_type):
         assert x == y
 
 
+@given(one_of(seqs_of_primitives, dicts_of_primitives))
+def test_structuring_passthrough(collection_and_type):
+    # type: (Any) -> None
+    """Collections of structured primitives are copied at once, or passed
+    through."""
+    collection, t = collection_and_type
+    converter = Converter()
+    converted = converter.structure(collection, t)
+    assert converted == type(converted)(collection)
+    if isinstance(collection, (list, dict)):
+        assert converted is not collection
+
+    converter = Converter(copy_collections=False)
+    converted = converter.structure(collection, t)
+    assert converted == type(converted)(collection)
+
+
+def test_structuring_without_copying():
+    """Without copying, structured collections are passed through."""
+    converter = Converter(copy_collections=False)
+    ints, strs = [1, 2], {u'a': u'b'}
+    assert converter.structure(ints, List[int]) is ints
+    assert converter.structure(strs, Dict[unicode, unicode]) is strs
+    assert converter.structure(strs, Dict[Any, unicode]) is strs
+
+    # Elements of other classes are still structured.
+    assert converter.structure([True, u'2'], List[int]) == [1, 2]
+    assert converter.structure({u'a': 1}, Dict[unicode, float]) == {u'a': 1.0}
+
+
 @given(sets_of_primitives, set_types)
 def test_structuring_sets(converter, set_and_type, set_type):
     # type: (Converter, Any, Type) -> None
@@ -111,8 +149,8 @@ def test_stringifying_sets(converter, set_and_type):
     """Test structuring generic sets and converting the contents to str."""
     set_, input_set_type = set_and_type
 
-    input_set_type.__args__ = (unicode,)
-    converted = converter.structure(set_, input_set_type)
+    converted = converter.structure(set_,
+                                    _with_args(input_set_type, unicode))
     assert len(converted) == len(set_)
     for e in set_:
         assert _as_str(e) in converted
@@ -173,7 +211,7 @@ def test_structuring_dicts_opts(converter, dict_and_type, data):
     """Structure dicts, but with optional primitives."""
     d, t = dict_and_type
     assume(t.__args__)
-    t.__args__ = (t.__args__[0], Optional[t.__args__[1]])
+    t = _with_args(t, t.__args__[0], Optional[t.__args__[1]])
     d = {k: v if data.draw(booleans()) else None for k, v in d.items()}
 
     converted = converter.structure(d, t)
@@ -216,16 +254,11 @@ def test_structuring_lists_of_opt(converter, list_and_type):
         with raises(TypeError):
             converter.structure(l, t)
 
-    optional_t = Optional[args[0]]
-    t.__args__ = (optional_t, )
-
-    converted = converter.structure(l, t)
+    converted = converter.structure(l, _with_args(t, Optional[args[0]]))
 
     for x, y in zip(l, converted):
         assert x == y
 
-    t.__args__ = args
-
 
 @given(lists_of_primitives())
 def test_stringifying_lists_of_opt(converter, list_and_type):
@@ -264,6 +297,51 @@ def test_structuring_primitive_union_hook(converter, ints):
             assert unicode(x) == y
 
 
+@given(primitives_and_type)
+def test_structuring_primitive_unions(converter, primitive_and_type):
+    # type: (Converter, Any) -> None
+    """Unions of primitives pass members through, and coerce in order."""
+    val, t = primitive_and_type
+    union = Union[int, float, unicode, bytes, None]
+
+    assert converter.structure(val, union) is val
+    assert converter.structure(val, Optional[union]) is val
+    assert converter.structure(None, union) is None
+    assert converter.structure(True, Union[int, unicode]) == 1
+    assert converter.structure(u'1', Union[int, float]) == 1
+    assert converter.structure(u'1.5', Union[int, float]) == 1.5
+    with raises(ValueError):
+        converter.structure(u'a', Union[int, float])
+
+    def structure_int(obj, cl):
+        return int(obj) + 1
+
+    converter = Converter()
+    converter.register_structure_hook(int, structure_int)
+    assert converter.structure(1, Union[int, unicode]) == 2
+
+
+def test_structuring_optional_hooks():
+    """Optionals get specialized handlers, honoring hooks registered
+    later."""
+    converter = Converter()
+    handler = converter._structure_func.dispatch(Optional[int])
+    assert handler != converter._structure_union
+    assert handler is converter._structure_func.dispatch(Optional[int])
+    assert converter.structure(u'1', Optional[int]) == 1
+    assert converter.structure(None, Optional[int]) is None
+
+    converter.register_structure_hook(int, lambda obj, cl: int(obj) + 1)
+    assert converter.structure(u'1', Optional[int]) == 2
+    converter.register_structure_hook(Optional[int], lambda obj, cl: 3)
+    assert converter.structure(u'1', Optional[int]) == 3
+    # None isn't passed to hooks registered for optionals.
+    assert converter.structure(None, Optional[int]) is None
+    assert converter.structure([None, u'1'], List[Optional[int]]) == [None, 3]
+    assert converter._structure_union(None, Optional[int]) is None
+    assert converter._structure_union(u'1', Optional[int]) == 3
+
+
 def test_structure_hook_func(converter):
     """ testing the hook_func method """
 
@@ -286,6 +364,43 @@ def test_structure_hook_func(converter):
         converter.structure(10, Bar)
 
 
+def test_structure_hook_factory():
+    """Hook factories are called once per type, and collection hooks are
+    specialized per type."""
+    converter = Converter()
+    made = []
+
+    class Foo(object):
+        def __init__(self, cl, obj):
+            self.cl = cl
+            self.obj = obj
+
+    class Foo2(Foo):
+        pass
+
+    def factory(cl):
+        made.append(cl)
+        return lambda obj, _: cl(cl, obj)
+
+    converter.register_structure_hook_factory(
+        lambda cl: issubclass(cl, Foo), factory)
+
+    res = converter.structure([1, 2], List[Foo])
+    assert [(r.cl, r.obj) for r in res] == [(Foo, 1), (Foo, 2)]
+    assert converter.structure(3, Foo2).cl is Foo2
+    assert converter.structure({u'a': 4}, Dict[unicode, Foo])[u'a'].obj == 4
+    assert made == [Foo, Foo2]
+
+    dispatch = converter._structure_func.dispatch
+    assert dispatch(List[int]) is dispatch(List[int])
+    assert dispatch(List[int]) is not dispatch(List[float])
+    converter.register_structure_hook(int, lambda obj, _: 5)
+    assert converter.structure([u'1'], List[int]) == [5]
+    assert converter.structure({u'1': u'1'}, Dict[int, int]) == {5: 5}
+    assert converter.structure((u'1',), Tuple[int, ...]) == (5,)
+    assert converter.structure((u'1', 1), Tuple[int, float]) == (5, 1.0)
+
+
 @given(choices(), enums_of_primitives())
 def test_structuring_enums(converter, choice, enum):
     # type: (Converter, Any, Any) -> None
@@ -301,7 +416,7 @@ def test_structuring_unsupported(converter):
     with raises(ValueError):
         converter.structure(1, Converter)
     with raises(ValueError):
-        converter.structure(1, Union[int, unicode])
+        converter.structure(1, Union[int, List[int]])
 
 
 def test_subclass_registration_is_honored(converter):
@@ -322,3 +437,34 @@ def test_subclass_registration_is_honored(converter):
     converter.register_structure_hook(Bar, lambda obj, cls: cls("bar"))
     assert converter.structure(None, Foo).value == "foo"
     assert converter.structure(None, Bar).value == "bar"
+
+
+@given(seqs_of_primitives)
+def test_iter_structure_seqs(converter, seq_and_type):
+    # type: (Converter, Any) -> None
+    """Lazily structuring sequences yields the same elements."""
+    iterable, t = seq_and_type
+    assert (list(converter.iter_structure(iterable, t)) ==
+            list(converter.structure(iterable, t)))
+
+
+def test_iter_structure_is_lazy(converter):
+    """Elements are only consumed and structured on demand."""
+    consumed = []
+
+    def source():
+        for i in range(3):
+            consumed.append(i)
+            yield [unicode(i)]
+
+    it = converter.iter_structure(source(), List[List[int]])
+    assert consumed == []
+    assert next(it) == [0]
+    assert consumed == [0]
+    assert list(it) == [[1], [2]]
+
+    assert list(converter.iter_structure(
+        ['1', 2], Tuple[unicode, float])) == ['1', 2.0]
+
+    with raises(ValueError):
+        converter.iter_structure({}, Dict[int, int])
@@ -1,11 +1,22 @@
 """Loading of attrs classes."""
+import gc
+import threading
+import time
+from copy import copy
+from random import Random
+
+import attr
+import pytest
 from attr import asdict, astuple, Factory, fields, NOTHING
 from hypothesis import assume, given
-from hypothesis.strategies import data, lists, sampled_from
+from hypothesis.strategies import booleans, data, lists, sampled_from
+
+from typing import Any, List, Optional, Union
 
-from typing import Union
+from cattr import Converter, UnstructureStrategy
+from cattr._compat import bytes, unicode
 
-from . import simple_classes
+from . import run_in_threads, simple_classes
 
 
 @given(simple_classes())
@@ -108,3 +119,345 @@ def test_structure_union_explicit(converter, cl_and_vals_a, cl_and_vals_b):
 
     assert inst == converter.structure(converter.unstructure(inst),
                                        Union[cl_a, cl_b])
+
+
+def test_structure_fromdict_private_and_extra_keys(converter):
+    """
+    Private attributes are passed to `__init__` without the leading
+    underscore, attributes with `init=False` and unknown keys are ignored.
+    """
+    @attr.s
+    class A(object):
+        _a = attr.ib(type=int)
+        b = attr.ib(init=False, default=5)
+        c = attr.ib(default=1)
+
+    inst = converter.structure({'_a': '1', 'b': 2, 'd': 3}, A)
+    assert inst == A(1)
+    assert inst.b == 5
+    assert converter.structure({'_a': 1, 'c': 2}, A) == A(1, 2)
+
+
+def test_structure_fromdict_hooks_after_generation(converter):
+    """Hooks registered after a class was first structured are honored."""
+    @attr.s
+    class A(object):
+        a = attr.ib(type=int)
+
+    assert converter.structure({'a': '1'}, A) == A(1)
+
+    converter.register_structure_hook(int, lambda v, _: -int(v))
+    assert converter.structure({'a': '1'}, A) == A(-1)
+
+
+def test_structure_fromdict_missing_keys(converter):
+    """Missing required keys raise a TypeError naming them."""
+    @attr.s
+    class A(object):
+        a = attr.ib(type=int)
+        b = attr.ib(type=int)
+
+    @attr.s
+    class B(object):
+        a = attr.ib(type=int)
+        c = attr.ib(type=int, default=0)
+
+    with pytest.raises(TypeError) as exc_info:
+        converter.structure({'b': 1}, A)
+    assert str(exc_info.value) == "A is missing required fields: 'a'"
+    with pytest.raises(TypeError) as exc_info:
+        converter.structure({'c': 1}, B)
+    assert str(exc_info.value) == "B is missing required fields: 'a'"
+
+    # Other KeyErrors are passed through.
+    def structure_int(v, _):
+        raise KeyError('x')
+    converter.register_structure_hook(int, structure_int)
+    with pytest.raises(KeyError):
+        converter.structure({'a': 1, 'b': 1}, A)
+
+
+def test_structure_fromtuple_defaults(converter):
+    """Trailing attributes missing from the tuple use their defaults."""
+    @attr.s
+    class A(object):
+        a = attr.ib(type=int)
+        b = attr.ib(type=int, default=2)
+        c = attr.ib(default=3)
+
+    assert converter.structure_attrs_fromtuple(('1',), A) == A(1)
+    assert converter.structure_attrs_fromtuple(('1', '3'), A) == A(1, 3)
+    assert converter.structure_attrs_fromtuple(
+        ('1', '3', 'x', 'y'), A) == A(1, 3, 'x')
+
+
+@given(simple_classes(), booleans())
+def test_structure_many(converter, cl_and_vals, pause_gc):
+    # type: (Converter, Any, bool) -> None
+    """Structuring a batch is the same as structuring each object."""
+    cl, vals = cl_and_vals
+    objs = [cl(*vals), cl(*vals)]
+    dumped = [asdict(obj) for obj in objs]
+
+    assert converter.structure_many(dumped, cl, pause_gc=pause_gc) == objs
+    assert converter.structure_many(iter(dumped), cl) == objs
+    assert gc.isenabled()
+
+
+def test_structure_lazy(converter):
+    """Nested fields are structured on first access, and only once."""
+    calls = []
+
+    @attr.s(frozen=True, slots=True)
+    class Inner(object):
+        a = attr.ib(type=int)
+
+    @attr.s(frozen=True)
+    class Outer(object):
+        i = attr.ib(type=int)
+        inner = attr.ib(type=Inner)
+        inners = attr.ib(type=List[Inner])
+        d = attr.ib(type=List[int], default=Factory(list))
+
+    def structure_inners(obj, cl):
+        calls.append(obj)
+        return [Inner(**e) for e in obj]
+    converter.register_structure_hook(List[Inner], structure_inners)
+
+    raw = {'i': '1', 'inner': {'a': '2'}, 'inners': [{'a': 3}]}
+    outer = converter.structure_lazy(raw, Outer)
+    assert outer.i == 1
+    assert outer._cattrs_pending == {'inner': raw['inner'],
+                                     'inners': raw['inners']}
+    assert isinstance(outer, Outer)
+    assert not calls
+
+    assert outer.inners == outer.inners == [Inner(3)]
+    assert len(calls) == 1
+    assert outer.inner.a == 2
+    assert outer.inner.__class__ is Inner
+    assert outer == Outer(1, Inner(2), [Inner(3)])
+    assert outer._cattrs_pending == {}
+
+    with pytest.raises(attr.exceptions.FrozenInstanceError):
+        outer.inner = None
+    # Copies (and pickles) are plain instances.
+    copied = copy(outer)
+    assert copied == outer
+    assert type(copied) is Outer
+
+
+def test_structure_lazy_threads():
+    """Fields can be accessed for the first time by several threads."""
+    @attr.s(frozen=True)
+    class Outer(object):
+        ints = attr.ib(type=List[int])
+
+    cond = threading.Condition()
+    arrived = []
+
+    def structure_ints(obj, cl):
+        # Wait for both threads to start structuring the field.
+        deadline = time.time() + 5
+        with cond:
+            arrived.append(None)
+            cond.notify_all()
+            while len(arrived) < 2 and time.time() < deadline:
+                cond.wait(0.1)
+        return [int(e) for e in obj]
+
+    converter = Converter()
+    converter.register_structure_hook(List[int], structure_ints)
+    outer = converter.structure_lazy({'ints': ['1']}, Outer)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(outer.ints))
+               for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [[1], [1]]
+
+
+def test_structure_interning():
+    """Equal strings, bytes and frozen instances are shared when interning.
+    """
+    @attr.s(frozen=True, slots=True)
+    class Category(object):
+        name = attr.ib(type=unicode)
+        tag = attr.ib(type=bytes)
+
+    @attr.s(frozen=True)
+    class Item(object):
+        category = attr.ib(type=Category)
+        tags = attr.ib(type=List[unicode])
+
+    def text(c):
+        # Distinct, equal objects.
+        return u''.join([c] * 10)
+
+    def raw():
+        return {'category': {'name': text(u'a'), 'tag': b''.join([b'b'] * 10)},
+                'tags': [text(u'c')]}
+
+    converter = Converter(intern_size=2)
+    items = converter.structure_many([raw(), raw()], Item)
+    assert items[0] == items[1]
+    assert items[0] is not items[1]  # Unhashable lists.
+    assert items[0].category is items[1].category
+    assert items[0].tags[0] is items[1].tags[0]
+    assert converter.structure(text(u'a'), unicode) is items[0].category.name
+    assert Converter().structure(raw(), Item).category.name is not (
+        items[0].category.name)
+
+    # Only `intern_size` values of each type are kept.
+    for c in [u'x', u'y', u'c']:
+        converter.structure(text(c), unicode)
+    assert converter.structure(text(u'a'), unicode) is not (
+        items[0].category.name)
+
+    tuple_converter = Converter(unstruct_strat=UnstructureStrategy.AS_TUPLE,
+                                intern_size=16)
+    cats = tuple_converter.structure([[u'a', b'b'], [u'a', b'b']],
+                                     List[Category])
+    assert cats[0] is cats[1]
+
+
+def test_structure_interning_classes():
+    """Equal instances with fields of different classes aren't shared."""
+    @attr.s(frozen=True)
+    class C(object):
+        a = attr.ib(type=Union[int, float])
+
+    @attr.s(frozen=True)
+    class D(object):
+        c = attr.ib(type=C)
+
+    @attr.s(frozen=True)
+    class E(object):
+        a = attr.ib(type=Any)
+
+    converter = Converter(intern_size=100)
+    cs = converter.structure([{'a': 1}, {'a': 1.0}, {'a': 1}], List[C])
+    assert [c.a.__class__ for c in cs] == [int, float, int]
+    assert cs[0] is cs[2]
+    ds = converter.structure([{'c': {'a': 1}}, {'c': {'a': 1.0}}], List[D])
+    assert ds[1].c.a.__class__ is float
+    es = converter.structure([{'a': (1,)}, {'a': (1.0,)}], List[E])
+    assert es[1].a[0].__class__ is float
+
+
+def test_structure_interning_threads():
+    """Interning converters can be shared by threads."""
+    converter = Converter(intern_size=1).freeze([unicode])
+    vals = [u'a', u'b', u'c']
+
+    def work(seed):
+        rand = Random(seed)
+        for _ in range(20000):
+            val = rand.choice(vals)
+            assert converter.structure(val, unicode) == val
+
+    assert run_in_threads(work) == []
+
+
+@pytest.mark.parametrize('strat', list(UnstructureStrategy))
+def test_tagged_union(strat):
+    """Tagged unions are structured by tag, and tagged when unstructured."""
+    @attr.s
+    class A(object):
+        a = attr.ib(type=int)
+
+    @attr.s
+    class B(object):
+        a = attr.ib(type=int)
+
+    @attr.s
+    class C(object):
+        type = attr.ib(type=int)
+        a = attr.ib(type=int)
+
+    @attr.s
+    class Outer(object):
+        inner = attr.ib(type=Union[A, B, C, None])
+
+    converter = Converter(unstruct_strat=strat)
+    converter.register_tagged_union(Union[A, B, C, None],
+                                    {'a': A, 'b': B, 1: C, 2: C})
+    for inst in [A(1), B(1), C(1, 1), C(2, 1), None]:
+        unstructured = converter.unstructure(Outer(inst))
+        if isinstance(inst, (A, B)):
+            assert unstructured[0 if strat is UnstructureStrategy.AS_TUPLE
+                                else 'inner'] == {
+                'type': inst.__class__.__name__.lower(), 'a': 1}
+        assert converter.structure(unstructured, Outer) == Outer(inst)
+
+    with pytest.raises(ValueError):
+        converter.structure({'type': 'c', 'a': 1}, Union[A, B, C, None])
+    with pytest.raises(ValueError):
+        converter.structure({'a': 1}, Union[A, B, C, None])
+    with pytest.raises(ValueError):
+        converter.register_tagged_union(Union[A, B], {'c': C})
+    with pytest.raises(ValueError):
+        # The tag of A couldn't be added.
+        converter.register_tagged_union(Union[A, B], {'a': A, 'a2': A})
+
+
+def test_tagged_union_optional():
+    """None isn't passed to the hooks of tagged optionals."""
+    @attr.s
+    class Cat(object):
+        name = attr.ib(type=unicode)
+
+    converter = Converter()
+    converter.register_tagged_union(Optional[Cat], {'cat': Cat})
+
+    data = [None, {'type': 'cat', 'name': u'a'}]
+    assert converter.structure(data, List[Optional[Cat]]) == [None, Cat(u'a')]
+    assert converter.structure(None, Optional[Cat]) is None
+
+
+@pytest.mark.parametrize('strat', list(UnstructureStrategy))
+def test_structure_trusted(strat):
+    """Trusted converters pass through values of the right class."""
+    @attr.s
+    class Inner(object):
+        a = attr.ib(type=int)
+
+    @attr.s
+    class Outer(object):
+        inner = attr.ib(type=Inner)
+        f = attr.ib(type=float, default=0.0)
+        ints = attr.ib(type=List[int], default=Factory(list))
+
+    converter = Converter(unstruct_strat=strat, trusted=True)
+    inner = Inner(1)
+    assert converter.structure(inner, Inner) is inner
+    assert converter.structure_lazy(inner, Inner) is inner
+    outer = converter.structure(converter.unstructure(Outer(inner, 1.5)),
+                                Outer)
+    assert outer == Outer(inner, 1.5)
+
+    raw = converter.unstructure(Outer(inner, 1))
+    if strat is UnstructureStrategy.AS_DICT:
+        raw['inner'] = inner
+    else:
+        raw = (inner,) + raw[1:]
+    outer = converter.structure(raw, Outer)
+    assert outer.inner is inner
+    # Values of other classes are still structured.
+    assert outer.f.__class__ is float
+    assert converter.structure(u'1', int) == 1
+    assert converter.structure(iter([u'1']), List[int]) == [1]
+
+    # Each value is looked up once.
+    lookups = []
+
+    class Counting(dict if strat is UnstructureStrategy.AS_DICT else tuple):
+        def __getitem__(self, key):
+            lookups.append(key)
+            return super(Counting, self).__getitem__(key)
+
+    inner_raw = converter.unstructure(inner)
+    assert converter.structure(Counting(inner_raw), Inner) == inner
+    assert len(lookups) == 1
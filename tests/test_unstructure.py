@@ -1,9 +1,16 @@
 """Tests for dumping."""
-from . import (seqs_of_primitives, dicts_of_primitives, enums_of_primitives,
-               simple_classes, nested_classes)
+from collections import OrderedDict
+from random import Random
+from typing import FrozenSet, List, Mapping, Optional, Tuple
 
+from . import (run_in_threads, seqs_of_primitives, dicts_of_primitives,
+               enums_of_primitives, simple_classes, nested_classes)
+from .metadata import nested_typed_classes
+
+from cattr._compat import unicode
 from cattr.converters import Converter, UnstructureStrategy
 
+import attr
 from attr import asdict, astuple
 from hypothesis import given
 from hypothesis.strategies import sampled_from, choices
@@ -59,6 +66,28 @@ def test_attrs_asdict_unstructure(converter, nested_class):
     assert converter.unstructure(instance) == asdict(instance)
 
 
+@given(nested_typed_classes)
+def test_attrs_asdict_unstructure_typed(converter, cl_and_vals):
+    # type: (Converter, Any) -> None
+    """Dumping classes with type metadata is identical to `attrs`."""
+    cl, vals = cl_and_vals
+    inst = cl(*vals)
+    assert converter.unstructure(inst) == asdict(inst)
+
+
+@given(nested_typed_classes)
+def test_attrs_asdict_dict_factory(cl_and_vals):
+    # type: (Any) -> None
+    """The dict factory is used for all dumped classes."""
+    converter = Converter(dict_factory=OrderedDict)
+    cl, vals = cl_and_vals
+    inst = cl(*vals)
+    dumped = converter.unstructure(inst)
+    assert dumped == asdict(inst)
+    assert isinstance(dumped, OrderedDict)
+    assert list(dumped) == [a.name for a in attr.fields(cl)]
+
+
 @given(nested_classes)
 def test_attrs_astuple_unstructure(nested_class):
     # type: (Type) -> None
@@ -81,6 +110,68 @@ def test_unstructure_hooks(converter, cl_and_vals):
     assert converter.unstructure(inst) == 'test'
 
 
+@given(nested_classes)
+def test_unstructure_many(converter, nested_class):
+    # type: (Converter, Any) -> None
+    """Unstructuring a batch is the same as unstructuring each object."""
+    instance = nested_class[0]()
+    objs = [instance, instance]
+    expected = [asdict(instance), asdict(instance)]
+
+    assert converter.unstructure_many(objs) == expected
+    assert converter.unstructure_many(objs, nested_class[0]) == expected
+    assert converter.unstructure_many(iter(objs), pause_gc=True) == expected
+
+
+@given(nested_typed_classes)
+def test_unstructure_view(cl_and_vals):
+    # type: (Any) -> None
+    """Views unstructure attributes on access, like unstructuring."""
+    converter = Converter(dict_factory=OrderedDict)
+    cl, vals = cl_and_vals
+    inst = cl(*vals)
+    view = converter.unstructure_view(inst)
+    names = [a.name for a in attr.fields(cl)]
+
+    assert isinstance(view, Mapping)
+    assert list(view) == names
+    assert len(view) == len(names)
+    assert 'not_a_field' not in view
+    expected = asdict(inst)
+    # Compared in lists, so identical NaNs are equal.
+    assert [view[name] for name in names] == [expected[n] for n in names]
+    assert all(view[name] is view[name] for name in names)
+    materialized = converter.unstructure_view(inst).materialize()
+    assert isinstance(materialized, OrderedDict)
+    assert materialized == converter.unstructure(inst)
+
+
+def test_unstructure_hooks_typed_fields(converter):
+    """
+    Hooks registered after a class was first dumped are honored, and values
+    not exactly of the declared field type use their own hooks.
+    """
+    @attr.s
+    class Inner(object):
+        a = attr.ib(type=int)
+
+    class InnerSubclass(Inner):
+        pass
+
+    @attr.s
+    class Outer(object):
+        i = attr.ib(type=Inner)
+
+    assert converter.unstructure(Outer(Inner(1))) == {'i': {'a': 1}}
+
+    converter.register_unstructure_hook(Inner, lambda inner: inner.a)
+    assert converter.unstructure(Outer(Inner(1))) == {'i': 1}
+
+    converter.register_unstructure_hook(InnerSubclass, lambda inner: 'sub')
+    assert converter.unstructure(Outer(InnerSubclass(1))) == {'i': 'sub'}
+    assert converter.unstructure(Outer(None)) == {'i': None}
+
+
 def test_unstructure_hook_func(converter):
     """
     Unstructure hooks work.
@@ -102,3 +193,115 @@ def test_unstructure_hook_func(converter):
     b = Bar()
     assert converter.unstructure(Foo()) == "hi"
     assert converter.unstructure(b) is b
+
+
+def test_unstructure_hook_factory(converter):
+    """Unstructure hook factories are called once per class."""
+    made = []
+
+    class Foo(object):
+        pass
+
+    class Bar(object):
+        pass
+
+    def factory(cl):
+        made.append(cl)
+        return lambda obj: cl.__name__
+
+    converter.register_unstructure_hook_factory(
+        lambda cl: cl.__name__.startswith('F'), factory)
+
+    assert converter.unstructure([Foo(), Foo()]) == ['Foo', 'Foo']
+    b = Bar()
+    assert converter.unstructure(b) is b
+    assert made == [Foo]
+
+
+def test_unstructure_memo():
+    """Frozen instances with immutable fields are memoized by identity,
+    until hooks change."""
+    calls = []
+
+    @attr.s(frozen=True, slots=True)
+    class Inner(object):
+        a = attr.ib(type=int)
+
+    @attr.s(frozen=True)
+    class Outer(object):
+        inner = attr.ib(type=Optional[Inner])
+        b = attr.ib(type=Tuple[unicode, ...])
+        c = attr.ib(type=FrozenSet[int])
+
+    def unstructure_inner(inner):
+        calls.append(inner)
+        return (inner.a,)
+
+    converter = Converter(unstructure_memo_size=2)
+    converter.register_unstructure_hook(
+        Inner, converter.unstructure_attrs_astuple)
+    outer = Outer(Inner(1), (u'b',), frozenset([1]))
+
+    res = converter.unstructure(outer)
+    assert res == {'inner': (1,), 'b': (u'b',), 'c': frozenset([1])}
+    res['d'] = 1
+    assert converter.unstructure(outer) == {
+        'inner': (1,), 'b': (u'b',), 'c': frozenset([1])}
+    assert converter.unstructure(outer)['b'] is res['b']
+    converter.register_unstructure_hook(Inner, unstructure_inner)
+    assert converter.unstructure(outer)['inner'] == (1,)
+    assert len(calls) == 1
+    # With a custom hook, the unstructured form of Inner may be mutable.
+    converter.unstructure(outer)
+    assert len(calls) == 2
+
+    tuple_converter = Converter(unstruct_strat=UnstructureStrategy.AS_TUPLE,
+                                unstructure_memo_size=1)
+    assert (tuple_converter.unstructure(outer) is
+            tuple_converter.unstructure(outer))
+    # Equal instances are not the same instance.
+    other = Outer(Inner(1), (u'b',), frozenset([1]))
+    assert (tuple_converter.unstructure(other) is not
+            tuple_converter.unstructure(outer))
+    converter = Converter()
+    assert converter.unstructure(outer) is not converter.unstructure(outer)
+
+
+def test_unstructure_memo_threads():
+    """Memoizing converters can be shared by threads."""
+    @attr.s(frozen=True)
+    class A(object):
+        a = attr.ib(type=int)
+
+    converter = Converter(unstructure_memo_size=1).freeze([A])
+    instances = [A(i) for i in range(3)]
+
+    def work(seed):
+        rand = Random(seed)
+        for _ in range(20000):
+            a = rand.choice(instances)
+            assert converter.unstructure(a) == {'a': a.a}
+
+    assert run_in_threads(work) == []
+
+
+def test_unstructure_memo_mutable():
+    """Frozen instances with mutable or untyped fields aren't memoized."""
+    @attr.s(frozen=True)
+    class F(object):
+        xs = attr.ib(type=List[int])
+
+    @attr.s(frozen=True)
+    class G(object):
+        f = attr.ib(type=F)
+        a = attr.ib()
+
+    converter = Converter(unstructure_memo_size=8)
+    f = F([1, 2])
+    converter.unstructure(f)
+    f.xs.append(3)
+    assert converter.unstructure(f) == {'xs': [1, 2, 3]}
+
+    g = G(F([1]), 1)
+    converter.unstructure(g)['f']['xs'].append(99)
+    assert converter.unstructure(g) == {'f': {'xs': [1]}, 'a': 1}